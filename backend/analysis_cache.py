@@ -0,0 +1,69 @@
+import os
+import re
+from typing import Any, Callable, Dict, List, Optional
+
+from cache import DiskCache, MemoryCache, TieredCache, hash_key
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'analysis')
+
+
+def normalize_transcript(transcript: List[Dict[str, Any]]) -> str:
+    """Reduces a transcript to the parts that affect the analysis: cue text and start time."""
+    lines = []
+    for item in transcript:
+        text = re.sub(r'\s+', ' ', str(item['text'])).strip().lower()
+        lines.append(f"{float(item['start']):.2f} {text}")
+    return "\n".join(lines)
+
+
+class AnalysisCache:
+    """Caches ProcessedContent.to_dict() output keyed by transcript, model and prompt version."""
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        max_memory_entries: int = 256,
+        max_disk_entries: int = 2000,
+        ttl: Optional[float] = None
+    ):
+        disk = DiskCache(cache_dir, max_entries=max_disk_entries, ttl=ttl) if cache_dir else None
+        self._cache = TieredCache(MemoryCache(max_entries=max_memory_entries, ttl=ttl), disk)
+
+    @staticmethod
+    def key(transcript: List[Dict[str, Any]], model_name: str, prompt_version: str) -> str:
+        return hash_key('analysis', model_name, prompt_version, normalize_transcript(transcript))
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return self._cache.stats
+
+    def hit_rate(self) -> float:
+        return self._cache.hit_rate()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        return self._cache.get(key)
+
+    def set(self, key: str, data: Dict[str, Any]) -> None:
+        self._cache.set(key, data)
+
+    def get_or_compute(self, key: str, compute: Callable[[], Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+        """Returns the cached analysis, or runs compute once for all concurrent callers.
+        compute should return None for failed analyses so they are not cached."""
+        return self._cache.get_or_compute(key, compute)
+
+    def invalidate(self, key: str) -> None:
+        self._cache.invalidate(key)
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+
+def analysis_cache_from_env() -> AnalysisCache:
+    """Builds the analysis cache from ANALYSIS_CACHE_* environment variables."""
+    ttl = os.getenv('ANALYSIS_CACHE_TTL')
+    return AnalysisCache(
+        cache_dir=os.getenv('ANALYSIS_CACHE_DIR', DEFAULT_CACHE_DIR) or None,
+        max_memory_entries=int(os.getenv('ANALYSIS_CACHE_MEMORY_ENTRIES', 256)),
+        max_disk_entries=int(os.getenv('ANALYSIS_CACHE_DISK_ENTRIES', 2000)),
+        ttl=float(ttl) if ttl else None
+    )
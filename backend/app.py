@@ -1,96 +1,276 @@
-from flask import Flask, request, jsonify
+from flask import Blueprint, Flask, Response, current_app, request, jsonify, stream_with_context
 from flask_cors import CORS
-import subprocess
 from transcript_processor import PersonalDevelopmentProcessor
+from transcribe import load_transcript
+from transcript_cache import transcript_cache_from_env
+from analysis_cache import analysis_cache_from_env
+from llm_client import llm_client_options_from_env
+from jobs import QueueFullError, job_manager_from_env
+from batch import BatchRunner
+from registry import registry
+from process_info import mark_worker_ready, process_info
+from metrics import metrics
+from typing import Iterable, Optional
+import logging
+import gc
 import os
 import json
 
-app = Flask(__name__)
-app.run(debug=False)
+logger = logging.getLogger(__name__)
 
-# Configure CORS
-CORS(
-    app,
-    resources={r"/*": {"origins": "http://localhost:3000"}},
-    supports_credentials=True
-)
+# Components worth loading once in a preforking master; the Gemini client itself is created
+# per worker because gRPC channels do not survive fork
+PRELOAD_COMPONENTS = ("gemini_sdk", "spacy_nlp", "bart_tokenizer", "bart_model")
 
-@app.route('/transcribe', methods=['POST'])
+api = Blueprint('api', __name__)
+
+
+class Services:
+    """Long-lived state shared by the request handlers of one app."""
+
+    def __init__(self):
+        self.transcript_cache = transcript_cache_from_env()
+        self.processor = PersonalDevelopmentProcessor(
+            api_key=os.getenv('GOOGLE_API_KEY'),
+            result_cache=analysis_cache_from_env(),
+            prefilter_tokens=int(os.getenv('PREFILTER_TOKENS', 0)) or None,
+            local_timestamps=os.getenv('LOCAL_TIMESTAMPS', '0') == '1',
+            client_options=llm_client_options_from_env()
+        )
+        self.job_manager = job_manager_from_env()
+        self.job_manager.register('analyze', self.run_analysis_job)
+        self.max_batch_size = int(os.getenv('BATCH_MAX_VIDEOS', 200))
+        self.batch_runner = BatchRunner(
+            fetch=self.load_transcript,
+            analyze=self.processor.process_transcript,
+            fetch_concurrency=int(os.getenv('BATCH_FETCH_CONCURRENCY', 8)),
+            analysis_concurrency=int(os.getenv('BATCH_ANALYSIS_CONCURRENCY', 2))
+        )
+
+    def load_transcript(self, video_id):
+        return load_transcript(video_id, fetch=self.transcript_cache.get)
+
+    def collect_metrics(self):
+        """Cache and queue gauges, read fresh on every /metrics scrape."""
+        gauges = {"cache_hit_ratio": {}, "cache_lookups": {}}
+        for name, cache in (("transcript", self.transcript_cache), ("analysis", self.processor.result_cache)):
+            if cache is None:
+                continue
+            stats = cache.stats
+            gauges["cache_hit_ratio"][(("cache", name),)] = cache.hit_rate()
+            for outcome in ("memory_hits", "disk_hits", "misses", "coalesced"):
+                gauges["cache_lookups"][(("cache", name), ("outcome", outcome))] = stats[outcome]
+        gauges["queue_depth"] = {
+            (("queue", "jobs"),): self.job_manager.queue_size(),
+            (("queue", "llm_calls"),): self.processor.pending_llm_calls()
+        }
+        return gauges
+
+    def run_analysis_job(self, payload):
+        """Fetches and analyzes one video; runs on a job worker thread."""
+        transcript = self.load_transcript(payload["video_id"])
+        if transcript is None:
+            raise RuntimeError("Transcription failed.")
+        analysis = self.processor.process_transcript(transcript["structured_transcript"])
+        if analysis.get("status") == "error":
+            # Raising marks the job failed with the message instead of succeeded with an error inside
+            raise RuntimeError(analysis.get("message", "Analysis failed."))
+        return {
+            "combined_text": transcript["combined_text"],
+            "structured_transcript": transcript["structured_transcript"],
+            "analysis": analysis
+        }
+
+
+def services() -> Services:
+    return current_app.extensions['analyzer']
+
+
+def preload(components: Optional[Iterable[str]] = None) -> None:
+    """Loads heavy components in the current process before workers are forked.
+
+    Import the modules that register components first (create_app does this), then
+    call preload() from the WSGI server's master, e.g. gunicorn's on_starting hook or
+    --preload. gc.freeze() moves everything loaded so far out of the collector's reach
+    so workers do not dirty those pages and lose copy-on-write sharing.
+    """
+    import sections  # registers the spaCy and BART loaders
+
+    registry.warm_up(components if components is not None else PRELOAD_COMPONENTS, background=False)
+    gc.collect()
+    gc.freeze()
+
+
+def create_app() -> Flask:
+    """Builds the Flask app. Safe to call in a preforking master: worker threads and
+    SQLite connections are only opened inside the process that first uses them."""
+    app = Flask(__name__)
+
+    # Configure CORS
+    CORS(
+        app,
+        resources={r"/*": {"origins": "http://localhost:3000"}},
+        supports_credentials=True
+    )
+
+    app.extensions['analyzer'] = Services()
+    # Named, so building another app replaces this collector instead of adding a second one
+    metrics.register_collector('analyzer', app.extensions['analyzer'].collect_metrics)
+    app.register_blueprint(api)
+
+    mark_worker_ready()
+    return app
+
+
+def start_warm_up() -> None:
+    """Optionally loads heavy components in the background so the first request does not pay
+    for them, e.g. WARM_UP=gemini_sdk or WARM_UP=all. Call it in the process that serves
+    requests, e.g. gunicorn's post_worker_init, never in a master that is about to fork:
+    a fork while the thread holds a registry lock leaves that lock held in the child."""
+    warm_up = os.getenv('WARM_UP', '')
+    if warm_up:
+        registry.warm_up(None if warm_up == 'all' else warm_up.split(','))
+
+
+@api.route('/transcribe', methods=['POST'])
 def fetch_transcript():
     youtube_id = request.json.get('YouTubeVideoID')
     if not youtube_id:
         return jsonify({"message": "YouTubeVideoID is required."}), 400
 
-    print(f"Received YouTube URL: {youtube_id}")  # Debug log
-    
+    logger.debug("Received YouTube video ID: %s", youtube_id)
+
     try:
-        # Run the transcription script
-        result = subprocess.run(['python', 'transcribe.py', youtube_id], capture_output=True, text=True)
-
-        if result.returncode == 0:
-            # Log the raw output for debugging purposes
-            print(f"Raw stdout: {result.stdout}")
-            
-            # Clean the stdout output: strip any unwanted characters or extra spaces
-            cleaned_stdout = result.stdout.strip()
-            
-            # Attempt to parse the cleaned output as JSON
-            try:
-                structured_transcript = json.loads(cleaned_stdout)
-                
-                # Optionally filter out unwanted elements like non-speech text
-                structured_transcript = [item for item in structured_transcript if item['text'] != '[Music]']
-                
-                print(f"Structured Transcript: {structured_transcript}")  # Debug log
-                
-            except json.JSONDecodeError as e:
-                return jsonify({"message": f"Error decoding JSON: {str(e)}", "stdout": cleaned_stdout}), 500
-            
-            # Read combined text from the file
-            with open("transcript.txt", "r") as file:
-                combined_text = file.read().strip()
-
-            return jsonify({
-                "message": "Transcription completed successfully.",
-                "combined_text": combined_text,
-                "structured_transcript": structured_transcript
-            }), 200
-        else:
+        # Fetch the transcript in-process
+        result = services().load_transcript(youtube_id)
+        if result is None:
             return jsonify({"message": "Transcription failed."}), 500
+
+        return jsonify({
+            "message": "Transcription completed successfully.",
+            "combined_text": result["combined_text"],
+            "structured_transcript": result["structured_transcript"]
+        }), 200
     except Exception as e:
         return jsonify({"message": str(e)}), 500
 
 
-
-
-
-api_key = os.getenv('GOOGLE_API_KEY')
-processor = PersonalDevelopmentProcessor(api_key=api_key)
-
-@app.route('/process-transcript', methods=['POST'])
+@api.route('/process-transcript', methods=['POST'])
 def process_transcript():
     try:
         data = request.get_json()
         transcript = data.get('transcript')
-        
+
         if not transcript:
             return jsonify({"status": "error", "message": "No transcript provided"}), 400
-            
+
         # Validate transcript format
         if not isinstance(transcript, list):
             return jsonify({"status": "error", "message": "Transcript must be an array of objects"}), 400
-            
+
         for item in transcript:
             if not isinstance(item, dict) or 'text' not in item or 'start' not in item:
                 return jsonify({"status": "error", "message": "Invalid transcript format"}), 400
 
-        result = processor.process_transcript(transcript)
+        result = services().processor.process_transcript(transcript)
         return jsonify(result)
 
     except Exception as e:
-        print(f"Error in process_transcript endpoint: {str(e)}")
+        logger.exception("Error in process_transcript endpoint: %s", e)
         return jsonify({"status": "error", "message": str(e)}), 500
 
 
+def sse_event(event, data):
+    """Formats one Server-Sent Events message."""
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@api.route('/stream-analysis', methods=['GET'])
+def stream_analysis():
+    youtube_id = request.args.get('YouTubeVideoID')
+    if not youtube_id:
+        return jsonify({"message": "YouTubeVideoID is required."}), 400
+
+    state = services()
+
+    def generate():
+        transcript = state.load_transcript(youtube_id)
+        if transcript is None:
+            yield sse_event("error", {"message": "Transcription failed."})
+            return
+        yield sse_event("transcript", transcript)
+
+        try:
+            for event, data in state.processor.stream_transcript(transcript["structured_transcript"]):
+                yield sse_event(event, data)
+        except Exception as e:
+            logger.exception("Error in stream_analysis endpoint: %s", e)
+            yield sse_event("error", {"message": str(e)})
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@api.route('/jobs', methods=['POST'])
+def submit_job():
+    youtube_id = (request.get_json(silent=True) or {}).get('YouTubeVideoID')
+    if not youtube_id:
+        return jsonify({"message": "YouTubeVideoID is required."}), 400
+
+    try:
+        job = services().job_manager.submit('analyze', youtube_id, {"video_id": youtube_id})
+    except QueueFullError as e:
+        return jsonify({"message": str(e)}), 429, {"Retry-After": "5"}
+
+    return jsonify({"job_id": job.id, "status": job.status}), 202
+
+@api.route('/jobs/<job_id>', methods=['GET'])
+def get_job(job_id):
+    job = services().job_manager.get(job_id)
+    if job is None:
+        return jsonify({"message": "Job not found."}), 404
+    return jsonify(job.to_dict()), 200
+
+
+@api.route('/batch', methods=['POST'])
+def process_batch():
+    state = services()
+    video_ids = (request.get_json(silent=True) or {}).get('YouTubeVideoIDs')
+    if not isinstance(video_ids, list) or not video_ids or not all(isinstance(v, str) and v for v in video_ids):
+        return jsonify({"message": "YouTubeVideoIDs must be a non-empty array of video IDs."}), 400
+    if len(video_ids) > state.max_batch_size:
+        return jsonify({"message": f"At most {state.max_batch_size} videos can be processed per batch."}), 400
+
+    # One JSON object per line, written as each video finishes, followed by a stats line
+    def generate():
+        for result in state.batch_runner.run(video_ids):
+            yield json.dumps(result) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+
+@api.route('/health', methods=['GET'])
+def health():
+    # Reports which heavy components are loaded, their cold-start times, and this
+    # worker's memory and startup time for capacity planning
+    return jsonify({
+        "status": "ok",
+        "components": registry.status(),
+        "process": process_info()
+    }), 200
+
+
+@api.route('/metrics', methods=['GET'])
+def metrics_endpoint():
+    # Prometheus text format: per-stage latency histograms, prompt/response sizes,
+    # cache hit rates and queue depths for this worker
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+
+app = create_app()
+
 if __name__ == '__main__':
+    start_warm_up()
     app.run(debug=True)
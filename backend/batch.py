@@ -0,0 +1,96 @@
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+
+class BatchRunner:
+    """Fetches and analyzes many videos with separate concurrency limits for each stage.
+
+    Transcript fetches are I/O bound and can run wide; analyses are capped lower so
+    batches stay inside the LLM rate limit. The analysis cap is shared by every run()
+    on this runner, so concurrent batch requests together never run more than
+    analysis_concurrency analyses. Results are yielded as each video finishes.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str], Optional[Dict[str, Any]]],
+        analyze: Callable[[List[Dict[str, Any]]], Dict[str, Any]],
+        fetch_concurrency: int = 8,
+        analysis_concurrency: int = 2
+    ):
+        self.fetch = fetch
+        self.analyze = analyze
+        self.fetch_concurrency = fetch_concurrency
+        self.analysis_concurrency = analysis_concurrency
+        self._analysis_slots = threading.BoundedSemaphore(analysis_concurrency)
+
+    def run(self, video_ids: List[str]) -> Iterator[Dict[str, Any]]:
+        """Yields one result dict per video in completion order, then a stats dict."""
+        video_ids = list(dict.fromkeys(video_ids))
+        results: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+        started = time.perf_counter()
+        fetch_times, analysis_times = [], []
+        # Set when the caller stops reading, so analyses still waiting for a slot are skipped
+        abandoned = threading.Event()
+
+        fetch_pool = ThreadPoolExecutor(max_workers=self.fetch_concurrency, thread_name_prefix='batch-fetch')
+        analysis_pool = ThreadPoolExecutor(max_workers=self.analysis_concurrency, thread_name_prefix='batch-analyze')
+
+        def analyze_video(video_id: str, transcript: Dict[str, Any]) -> None:
+            with self._analysis_slots:
+                if abandoned.is_set():
+                    return
+                stage_start = time.perf_counter()
+                try:
+                    analysis = self.analyze(transcript["structured_transcript"])
+                except Exception as e:
+                    analysis = {"status": "error", "message": str(e)}
+                analysis_times.append(time.perf_counter() - stage_start)
+            if analysis.get("status") == "success":
+                results.put({"type": "result", "video_id": video_id, "status": "success", "data": analysis["data"]})
+            else:
+                results.put({"type": "result", "video_id": video_id, "status": "error",
+                             "message": analysis.get("message", "Analysis failed.")})
+
+        def fetch_video(video_id: str) -> None:
+            stage_start = time.perf_counter()
+            try:
+                transcript = self.fetch(video_id)
+            except Exception:
+                transcript = None
+            fetch_times.append(time.perf_counter() - stage_start)
+            if transcript is None:
+                results.put({"type": "result", "video_id": video_id, "status": "error",
+                             "message": "Transcription failed."})
+                return
+            analysis_pool.submit(analyze_video, video_id, transcript)
+
+        try:
+            for video_id in video_ids:
+                fetch_pool.submit(fetch_video, video_id)
+
+            succeeded = 0
+            for _ in video_ids:
+                result = results.get()
+                if result["status"] == "success":
+                    succeeded += 1
+                yield result
+        finally:
+            abandoned.set()
+            fetch_pool.shutdown(wait=False, cancel_futures=True)
+            analysis_pool.shutdown(wait=False, cancel_futures=True)
+
+        elapsed = time.perf_counter() - started
+        yield {
+            "type": "stats",
+            "videos": len(video_ids),
+            "succeeded": succeeded,
+            "failed": len(video_ids) - succeeded,
+            "elapsed_seconds": round(elapsed, 3),
+            "videos_per_minute": round(len(video_ids) / elapsed * 60, 2) if elapsed else 0.0,
+            "avg_fetch_seconds": round(sum(fetch_times) / len(fetch_times), 3) if fetch_times else 0.0,
+            "avg_analysis_seconds": round(sum(analysis_times) / len(analysis_times), 3) if analysis_times else 0.0
+        }
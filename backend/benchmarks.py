@@ -0,0 +1,251 @@
+"""Offline end-to-end benchmarks for the backend.
+
+YouTube and Gemini are replaced by the local fakes in fakes.py, so the numbers only
+reflect this code plus the simulated service latency. Examples:
+
+    python benchmarks.py --durations 5,60,180
+    python benchmarks.py --save-baseline baseline.json
+    python benchmarks.py --compare baseline.json --tolerance 0.25
+
+Pass --with-nlp to include EnhancedContentProcessor (needs spaCy) and --with-bart to
+use the real BART summarizer instead of the fake one. --nlp-workers compares the
+sequential path with the process pool, e.g. on multi-hour transcripts:
+
+    python benchmarks.py --durations 120,240 --with-nlp --nlp-workers 1,4
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, List
+
+import transcribe
+from fakes import FakeGenerativeModel, FakeSummarizer, FakeTranscriptProvider, synthetic_transcript
+from transcript_processor import PersonalDevelopmentProcessor
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    rank = (len(ordered) - 1) * pct / 100
+    lower = int(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def measure(func: Callable[[], Any], iterations: int, units: int = 1) -> Dict[str, float]:
+    """Runs func repeatedly and reports latency percentiles, throughput and peak Python memory."""
+    func()  # warm-up run, not timed
+
+    timings = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+
+    # Memory is measured in a separate run because tracemalloc slows everything down
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    mean = statistics.mean(timings)
+    return {
+        "p50_ms": round(percentile(timings, 50) * 1000, 2),
+        "p90_ms": round(percentile(timings, 90) * 1000, 2),
+        "p99_ms": round(percentile(timings, 99) * 1000, 2),
+        "mean_ms": round(mean * 1000, 2),
+        "throughput_per_s": round(units / mean, 2) if mean else 0.0,
+        "peak_memory_mb": round(peak / (1024 * 1024), 2)
+    }
+
+
+@contextmanager
+def fake_youtube(provider: FakeTranscriptProvider):
+    """Points transcribe.get_transcript at the fake provider for the duration of the block."""
+    original = transcribe.YouTubeTranscriptApi
+    transcribe.YouTubeTranscriptApi = provider
+    try:
+        yield provider
+    finally:
+        transcribe.YouTubeTranscriptApi = original
+
+
+def bench_transcribe(minutes: float, iterations: int, latency: float) -> Dict[str, Dict[str, float]]:
+    video_id = f"synthetic-{minutes:g}"
+    with fake_youtube(FakeTranscriptProvider(latency=latency)):
+        return {
+            "transcribe.get_transcript": measure(lambda: transcribe.get_transcript(video_id), iterations),
+            "transcribe.load_transcript": measure(lambda: transcribe.load_transcript(video_id), iterations)
+        }
+
+
+def bench_llm(
+    minutes: float, iterations: int, llm_latency: float, prefilter_tokens: int, llm_error_rate: float
+) -> Dict[str, Dict[str, float]]:
+    transcript = synthetic_transcript(minutes)
+    model = FakeGenerativeModel(base_latency=llm_latency)
+    processor = PersonalDevelopmentProcessor(api_key="offline", model=model)
+    results = {
+        "PersonalDevelopmentProcessor.process_transcript": measure(
+            lambda: processor.process_transcript(transcript), iterations, units=len(transcript)
+        ),
+        "PersonalDevelopmentProcessor._prepare_windows": measure(
+            lambda: processor._prepare_windows(transcript), iterations, units=len(transcript)
+        )
+    }
+    results["PersonalDevelopmentProcessor.process_transcript"]["llm_calls_per_run"] = round(
+        model.calls / (iterations + 2), 2
+    )
+    results["PersonalDevelopmentProcessor.process_transcript"]["prompt_chars_per_run"] = round(
+        model.prompt_chars / (iterations + 2)
+    )
+
+    # Hybrid mode: the local pre-filter trims the transcript before it is prompted
+    model = FakeGenerativeModel(base_latency=llm_latency)
+    processor = PersonalDevelopmentProcessor(api_key="offline", model=model, prefilter_tokens=prefilter_tokens)
+    stage = f"PersonalDevelopmentProcessor.process_transcript[prefilter={prefilter_tokens}]"
+    results[stage] = measure(lambda: processor.process_transcript(transcript), iterations, units=len(transcript))
+    results[stage]["llm_calls_per_run"] = round(model.calls / (iterations + 2), 2)
+    results[stage]["prompt_chars_per_run"] = round(model.prompt_chars / (iterations + 2))
+
+    # Rate-limited client against a model that answers some calls with 429s
+    model = FakeGenerativeModel(base_latency=llm_latency, error_rate=llm_error_rate, seed=0)
+    processor = PersonalDevelopmentProcessor(
+        api_key="offline", model=model,
+        client_options={"base_backoff": llm_latency / 4, "max_retries": 8, "seed": 0}
+    )
+    stage = f"PersonalDevelopmentProcessor.process_transcript[429 rate={llm_error_rate:g}]"
+    results[stage] = measure(lambda: processor.process_transcript(transcript), iterations, units=len(transcript))
+    results[stage]["llm_calls_per_run"] = round(model.calls / (iterations + 2), 2)
+    return results
+
+
+def bench_nlp(minutes: float, iterations: int, with_bart: bool, workers: List[int]) -> Dict[str, Dict[str, float]]:
+    from sections import EnhancedContentProcessor
+    from text_tiling import TextTilingSegmenter
+
+    text = transcribe.combine_transcript(synthetic_transcript(minutes))
+    with tempfile.NamedTemporaryFile("w", suffix=".txt", delete=False) as file:
+        file.write(text)
+        path = file.name
+    segment = " ".join(text.split()[:250])
+
+    results = {}
+    try:
+        # Each segmenter on sentences from the pipeline it runs with: TextTiling needs the
+        # lemmatizer, so its parse is timed too and the two totals can be compared
+        processor = EnhancedContentProcessor()
+        tiling = TextTilingSegmenter()
+        tiling_processor = EnhancedContentProcessor(segmenter=tiling)
+        for stage, parser in (("", processor), ("[lemmas]", tiling_processor)):
+            results[f"EnhancedContentProcessor.parse_sentences{stage}"] = measure(
+                lambda: list(parser.parse_sentences(text)), iterations, units=len(text.split())
+            )
+        sentences = list(processor.parse_sentences(text))
+        results["EnhancedContentProcessor.iter_segments"] = measure(
+            lambda: list(processor.iter_segments(sentences)), iterations, units=len(sentences)
+        )
+        lemma_sentences = list(tiling_processor.parse_sentences(text))
+        results["TextTilingSegmenter.segment"] = measure(
+            lambda: list(tiling.segment(lemma_sentences)), iterations, units=len(lemma_sentences)
+        )
+
+        for count in workers:
+            processor = EnhancedContentProcessor(
+                workers=count, summarizer=None if with_bart else FakeSummarizer()
+            )
+            # The warm-up run inside measure() also starts the pool, so startup is not timed
+            stage = "EnhancedContentProcessor.process_transcript"
+            if count > 1:
+                stage += f"[workers={count}]"
+            try:
+                results[stage] = measure(
+                    lambda: processor.process_transcript(path), iterations, units=len(text.split())
+                )
+                if count <= 1:
+                    results["EnhancedContentProcessor.process_segment"] = measure(
+                        lambda: processor.process_segment(segment), iterations
+                    )
+            finally:
+                processor.close()
+        return results
+    finally:
+        os.remove(path)
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float) -> List[str]:
+    """Lists every stage whose p50 latency is more than tolerance slower than the baseline."""
+    regressions = []
+    for scenario, stages in results.items():
+        for stage, stats in stages.items():
+            before = baseline.get(scenario, {}).get(stage)
+            if not before or not before.get("p50_ms"):
+                continue
+            change = stats["p50_ms"] / before["p50_ms"] - 1
+            if change > tolerance:
+                regressions.append(
+                    f"{scenario} {stage}: p50 {before['p50_ms']}ms -> {stats['p50_ms']}ms (+{change:.0%})"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--durations", default="5,60,180", help="Comma-separated transcript lengths in minutes")
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="Fake Gemini base latency in seconds")
+    parser.add_argument("--prefilter-tokens", type=int, default=3000, help="Token budget for the hybrid pre-filter run")
+    parser.add_argument("--llm-error-rate", type=float, default=0.2, help="Share of fake Gemini calls that fail with a 429")
+    parser.add_argument("--youtube-latency", type=float, default=0.0, help="Fake YouTube latency in seconds")
+    parser.add_argument("--with-nlp", action="store_true", help="Also benchmark EnhancedContentProcessor")
+    parser.add_argument("--with-bart", action="store_true", help="Use real BART instead of the fake summarizer")
+    parser.add_argument("--nlp-workers", default="1", help="Comma-separated process counts for --with-nlp")
+    parser.add_argument("--save-baseline", help="Write results to this JSON file")
+    parser.add_argument("--compare", help="Compare against a baseline JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed p50 slowdown before failing")
+    args = parser.parse_args()
+
+    results = {}
+    for minutes in (float(value) for value in args.durations.split(",")):
+        scenario = f"{minutes:g}min"
+        results[scenario] = {}
+        results[scenario].update(bench_transcribe(minutes, args.iterations, args.youtube_latency))
+        results[scenario].update(bench_llm(
+            minutes, args.iterations, args.llm_latency, args.prefilter_tokens, args.llm_error_rate
+        ))
+        if args.with_nlp:
+            workers = [int(value) for value in args.nlp_workers.split(",")]
+            results[scenario].update(bench_nlp(minutes, args.iterations, args.with_bart, workers))
+
+    for scenario, stages in results.items():
+        print(f"\n{scenario}")
+        for stage, stats in stages.items():
+            print(f"  {stage:<62} p50 {stats['p50_ms']:>9.2f}ms  p90 {stats['p90_ms']:>9.2f}ms  "
+                  f"p99 {stats['p99_ms']:>9.2f}ms  {stats['throughput_per_s']:>10.2f}/s  "
+                  f"peak {stats['peak_memory_mb']:.2f}MB")
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as file:
+            json.dump(results, file, indent=2)
+        print(f"\nSaved baseline to {args.save_baseline}")
+
+    if args.compare:
+        with open(args.compare) as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        if regressions:
+            print("\nRegressions:")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print("\nNo regressions against baseline.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import re
+from typing import Any, Callable, Dict, List, Set
+
+Cue = Dict[str, Any]
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token), good enough for prompt budgeting."""
+    return (len(text) + 3) // 4
+
+
+def format_cue(item: Cue) -> str:
+    return f"[{item['start']}] {item['text']}"
+
+
+def chunk_transcript(
+    transcript: List[Any],
+    max_tokens: int,
+    overlap_tokens: int = 200,
+    format_line: Callable[[Any], str] = format_cue
+) -> List[List[Any]]:
+    """Splits the cue list into windows of at most max_tokens, each window repeating
+    roughly overlap_tokens worth of cues from the end of the previous one. Other prompt
+    lines, such as compacted blocks, can be split the same way by passing their format_line."""
+    costs = [estimate_tokens(format_line(item)) + 1 for item in transcript]
+    windows = []
+    start = 0
+    while start < len(transcript):
+        end = start
+        used = 0
+        while end < len(transcript) and (end == start or used + costs[end] <= max_tokens):
+            used += costs[end]
+            end += 1
+        windows.append(transcript[start:end])
+        if end >= len(transcript):
+            break
+
+        # Step back over the tail of this window to build the overlap, always moving forward
+        next_start = end
+        overlap = 0
+        while next_start - 1 > start and overlap + costs[next_start - 1] <= overlap_tokens:
+            next_start -= 1
+            overlap += costs[next_start]
+        start = next_start
+    return windows
+
+
+def _word_set(text: str) -> Set[str]:
+    return set(re.findall(r"[a-z0-9']+", text.lower()))
+
+
+def _timestamp_value(item: Dict[str, Any]) -> float:
+    try:
+        return float(item.get('timestamp', ''))
+    except (TypeError, ValueError):
+        return float('inf')
+
+
+def merge_items(item_lists: List[List[Dict[str, Any]]], text_key: str, threshold: float = 0.8) -> List[Dict[str, Any]]:
+    """Merges per-window extraction results, dropping near-identical entries.
+
+    Two entries are duplicates when the Jaccard similarity of their word sets reaches
+    threshold; the earliest one is kept with its original timestamp.
+    """
+    candidates = sorted(
+        (item for items in item_lists for item in items if item.get(text_key)),
+        key=_timestamp_value
+    )
+    merged = []
+    seen = []
+    for item in candidates:
+        words = _word_set(item[text_key])
+        if any(len(words & other) / max(len(words | other), 1) >= threshold for other in seen):
+            continue
+        seen.append(words)
+        merged.append(item)
+    return merged
+
+
+def merge_analyses(responses: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Reduces the parsed JSON responses of several windows into one response."""
+    return {
+        "action_steps": merge_items([r.get('action_steps', []) for r in responses], 'action'),
+        "key_insights": merge_items([r.get('key_insights', []) for r in responses], 'keyInsight'),
+        "examples": merge_items([r.get('examples', []) for r in responses], 'example')
+    }
@@ -0,0 +1,163 @@
+import json
+import random
+import re
+import threading
+import time
+import zlib
+from typing import Any, Dict, Iterator, List, Optional
+
+# Local stand-ins for YouTube and Gemini, used by the benchmarks and for offline runs
+
+SENTENCES = [
+    "The first thing you should do is write your goals down every single morning.",
+    "Research actually shows that people who plan their week are far more consistent.",
+    "For example, one study followed students who tracked their habits for a month.",
+    "You need to start small because big changes rarely stick.",
+    "Most people underestimate how much a good night of sleep affects their focus.",
+    "Try to replace scrolling on your phone with ten minutes of reading.",
+    "The key principle here is that motivation follows action, not the other way around.",
+    "Interestingly, the people who succeeded were not more talented than the others.",
+    "Compared to willpower, a well designed environment is much more reliable.",
+    "So build a routine that makes the right choice the easy choice.",
+    "This video is sponsored by a meditation app that I have used for years.",
+    "If you found this helpful, make sure to like and subscribe.",
+]
+
+
+def synthetic_transcript(minutes: float, seed: int = 0, words_per_cue: int = 4, seconds_per_cue: float = 2.5) -> List[Dict[str, Any]]:
+    """Builds a caption-style cue list of roughly the given length."""
+    rng = random.Random(seed)
+    cues = []
+    start = 0.0
+    total = minutes * 60
+    while start < total:
+        words = rng.choice(SENTENCES).split()
+        for offset in range(0, len(words), words_per_cue):
+            duration = round(seconds_per_cue * rng.uniform(0.7, 1.3), 3)
+            cues.append({
+                "text": " ".join(words[offset:offset + words_per_cue]),
+                "start": round(start, 3),
+                "duration": duration
+            })
+            start += duration
+        if rng.random() < 0.02:
+            cues.append({"text": "[Music]", "start": round(start, 3), "duration": 2.0})
+            start += 2.0
+    return cues
+
+
+class FakeTranscriptProvider:
+    """Drop-in for YouTubeTranscriptApi.get_transcript.
+
+    Video IDs of the form "synthetic-<minutes>" produce a transcript of that length;
+    any other ID produces a ten-minute one.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.calls = 0
+
+    def get_transcript(self, video_id: str) -> List[Dict[str, Any]]:
+        self.calls += 1
+        time.sleep(self.latency)
+        match = re.match(r"synthetic-(\d+(?:\.\d+)?)$", video_id)
+        minutes = float(match.group(1)) if match else 10.0
+        return synthetic_transcript(minutes, seed=zlib.crc32(video_id.encode('utf-8')))
+
+
+class FakeResponse:
+    def __init__(self, text: str):
+        self.text = text
+
+
+class RateLimitError(Exception):
+    """Stands in for the provider's 429 / ResourceExhausted error."""
+
+    code = 429
+
+
+class FakeGenerativeModel:
+    """Drop-in for genai.GenerativeModel with configurable latency and failures.
+
+    Latency is base_latency plus per_1k_tokens for every ~1000 prompt tokens.
+    error_rate injects RateLimitError on that fraction of calls, and malformed_rate
+    cuts that fraction of JSON answers off part way through.
+    """
+
+    def __init__(
+        self,
+        base_latency: float = 0.5,
+        per_1k_tokens: float = 0.05,
+        error_rate: float = 0.0,
+        seed: int = 0,
+        malformed_rate: float = 0.0
+    ):
+        self.base_latency = base_latency
+        self.per_1k_tokens = per_1k_tokens
+        self.error_rate = error_rate
+        self.malformed_rate = malformed_rate
+        self.calls = 0
+        self.prompt_chars = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _latency(self, prompt: str) -> float:
+        return self.base_latency + self.per_1k_tokens * len(prompt) / 4000
+
+    def _answer(self, prompt: str) -> str:
+        timestamps = re.findall(r"^\s*\[(\d+(?:\.\d+)?)\]", prompt, re.MULTILINE) or ["0"]
+        if any(f'"{section}"' in prompt for section in ("action_steps", "key_insights", "examples")):
+            return json.dumps({
+                "action_steps": [
+                    {"action": "Write your goals down every morning",
+                     "explanation": "Keeps the goal in view.", "timestamp": timestamps[0]}
+                ],
+                "key_insights": [
+                    {"keyInsight": "Motivation follows action", "timestamp": timestamps[len(timestamps) // 2]}
+                ],
+                "examples": [
+                    {"example": "Students who tracked their habits for a month", "timestamp": timestamps[-1]}
+                ]
+            })
+        return "The video explains how small, consistent actions and a good environment lead to reaching goals."
+
+    def generate_content(self, prompt: str, stream: bool = False, **kwargs) -> Any:
+        with self._lock:
+            self.calls += 1
+            self.prompt_chars += len(prompt)
+            fail = self._rng.random() < self.error_rate
+            malformed = self._rng.random() < self.malformed_rate
+        time.sleep(self._latency(prompt))
+        if fail:
+            raise RateLimitError("429 Resource has been exhausted (e.g. check quota).")
+        text = self._answer(prompt)
+        if malformed and text.startswith("{"):
+            text = text[:len(text) * 2 // 3]
+        if stream:
+            return self._stream(text)
+        return FakeResponse(text)
+
+    def _stream(self, text: str) -> Iterator[FakeResponse]:
+        words = text.split(" ")
+        for offset in range(0, len(words), 5):
+            yield FakeResponse(" ".join(words[offset:offset + 5]) + " ")
+
+
+class FakeSummarizer:
+    """Stands in for BatchSummarizer when BART is not installed or not wanted."""
+
+    def __init__(self, latency_per_segment: float = 0.0):
+        self.latency_per_segment = latency_per_segment
+        self.stats = {"segments": 0, "batches": 0, "seconds": 0.0}
+        self.model = None
+
+    def summarize(self, texts: List[str]) -> List[str]:
+        started = time.perf_counter()
+        time.sleep(self.latency_per_segment * len(texts))
+        self.stats["segments"] += len(texts)
+        self.stats["batches"] += 1
+        self.stats["seconds"] += time.perf_counter() - started
+        return [" ".join(text.split()[:30]) for text in texts]
+
+    def segments_per_second(self) -> float:
+        return self.stats["segments"] / self.stats["seconds"] if self.stats["seconds"] else 0.0
@@ -0,0 +1,37 @@
+# Production server settings: gunicorn -c gunicorn.conf.py
+# The app (and with PRELOAD_MODELS=1 the spaCy/BART weights) is loaded once in the master
+# and shared copy-on-write with the forked workers.
+import os
+
+wsgi_app = "app:app"
+bind = os.getenv("BIND", "0.0.0.0:5000")
+workers = int(os.getenv("WEB_CONCURRENCY", 2))
+threads = int(os.getenv("WORKER_THREADS", 8))
+timeout = int(os.getenv("WORKER_TIMEOUT", 300))
+# Must stay on so the master preloads the app
+preload_app = True
+
+# GET /jobs/<id> can land on any worker, so with more than one the jobs are kept in SQLite.
+# The config is read before the app is loaded, so job_manager_from_env() sees this default.
+if workers > 1:
+    os.environ.setdefault("JOB_STORE", "sqlite")
+
+
+def on_starting(server):
+    if os.getenv("PRELOAD_MODELS", "0") == "1":
+        from app import preload
+        preload()
+
+
+def post_fork(server, worker):
+    from process_info import mark_worker_started
+    mark_worker_started()
+
+
+def post_worker_init(worker):
+    from app import start_warm_up
+    from process_info import mark_worker_ready, process_info
+    # Background warm-up starts only after the fork, so no thread is running in the master
+    start_warm_up()
+    mark_worker_ready()
+    worker.log.info(f"Worker ready: {process_info()}")
@@ -0,0 +1,256 @@
+import json
+import os
+import queue
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field, asdict
+from typing import Any, Callable, Dict, Optional
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+ACTIVE_STATUSES = (QUEUED, RUNNING)
+
+DEFAULT_DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'jobs.sqlite3')
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at its configured depth."""
+
+
+@dataclass
+class Job:
+    id: str
+    kind: str
+    key: str
+    payload: Dict[str, Any]
+    status: str = QUEUED
+    result: Optional[Any] = None
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        del data["payload"]
+        return data
+
+
+class InMemoryJobStore:
+    """Keeps jobs in a dict; fine for a single process, lost on restart."""
+
+    def __init__(self, max_finished: int = 1000):
+        self.max_finished = max_finished
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def save(self, job: Job) -> None:
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def find_active(self, key: str) -> Optional[Job]:
+        with self._lock:
+            for job in self._jobs.values():
+                if job.key == key and job.status in ACTIVE_STATUSES:
+                    return job
+        return None
+
+    def _prune(self) -> None:
+        finished = [job for job in self._jobs.values() if job.status not in ACTIVE_STATUSES]
+        if len(finished) <= self.max_finished:
+            return
+        finished.sort(key=lambda job: job.finished_at or 0)
+        for job in finished[:len(finished) - self.max_finished]:
+            del self._jobs[job.id]
+
+
+def _process_alive(pid: Optional[int]) -> bool:
+    if not pid:
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        # The process exists but belongs to another user
+        return True
+    return True
+
+
+class SqliteJobStore:
+    """Persists jobs to a local SQLite file so results survive restarts.
+
+    Each row records the pid of the process whose queue holds the job. Queued and
+    running jobs whose process has exited (a killed or recycled worker, or a previous
+    server run) can never finish, so they are marked failed as soon as they are read.
+    """
+
+    def __init__(self, path: str = DEFAULT_DB_PATH):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = None
+        self._conn_pid = None
+        conn = self._connection()
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS jobs ("
+            "id TEXT PRIMARY KEY, kind TEXT, key TEXT, status TEXT, data TEXT, owner INTEGER)"
+        )
+        if "owner" not in {row[1] for row in conn.execute("PRAGMA table_info(jobs)")}:
+            conn.execute("ALTER TABLE jobs ADD COLUMN owner INTEGER")
+        conn.execute("CREATE INDEX IF NOT EXISTS jobs_key ON jobs (key, status)")
+        conn.commit()
+
+    def _connection(self) -> sqlite3.Connection:
+        # SQLite connections must not be shared across fork, so each process opens its own
+        if self._conn is None or self._conn_pid != os.getpid():
+            self._conn = sqlite3.connect(self.path, check_same_thread=False)
+            self._conn_pid = os.getpid()
+        return self._conn
+
+    def save(self, job: Job) -> None:
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO jobs (id, kind, key, status, data, owner) VALUES (?, ?, ?, ?, ?, ?)",
+                (job.id, job.kind, job.key, job.status, json.dumps(asdict(job)), os.getpid())
+            )
+            conn.commit()
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._connection().execute(
+                "SELECT id, status, data, owner FROM jobs WHERE id = ?", (job_id,)
+            ).fetchone()
+            return self._load(self._expire_orphan(row))
+
+    def find_active(self, key: str) -> Optional[Job]:
+        with self._lock:
+            rows = self._connection().execute(
+                "SELECT id, status, data, owner FROM jobs WHERE key = ? AND status IN (?, ?)",
+                (key, QUEUED, RUNNING)
+            ).fetchall()
+            for row in rows:
+                row = self._expire_orphan(row)
+                if row[1] in ACTIVE_STATUSES:
+                    return self._load(row)
+        return None
+
+    def _expire_orphan(self, row):
+        """Marks an active job failed when the process that owns it is gone. Called with the lock held."""
+        if row is None or row[1] not in ACTIVE_STATUSES or _process_alive(row[3]):
+            return row
+        conn = self._connection()
+        conn.execute("UPDATE jobs SET status = ? WHERE id = ? AND status IN (?, ?)", (FAILED, row[0], QUEUED, RUNNING))
+        conn.commit()
+        return (row[0], FAILED, row[2], row[3])
+
+    @staticmethod
+    def _load(row) -> Optional[Job]:
+        if row is None:
+            return None
+        _, status, data, _ = row
+        job = Job(**json.loads(data))
+        job.status = status
+        if status == FAILED and job.error is None:
+            job.error = "Job was interrupted because the server process running it stopped."
+        return job
+
+
+class JobManager:
+    """Runs submitted jobs on a fixed pool of worker threads behind a bounded queue.
+
+    Submitting a job whose key matches a queued or running job returns that job
+    instead of starting a duplicate; submitting to a full queue raises QueueFullError.
+    Worker threads are started on the first submit in each process, so a manager
+    created before a preforking server forks still works in every worker.
+    """
+
+    def __init__(self, store=None, workers: int = 4, queue_depth: int = 32):
+        self.store = store if store is not None else InMemoryJobStore()
+        self.workers = workers
+        self.queue_depth = queue_depth
+        self._queue: "queue.Queue[Job]" = queue.Queue(maxsize=queue_depth)
+        self._handlers: Dict[str, Callable[[Dict[str, Any]], Any]] = {}
+        self._submit_lock = threading.Lock()
+        self._threads = []
+        self._threads_pid = None
+
+    def _ensure_workers(self) -> None:
+        if self._threads_pid == os.getpid():
+            return
+        # Threads do not survive fork; start a fresh pool and queue in this process
+        self._queue = queue.Queue(maxsize=self.queue_depth)
+        self._threads = []
+        for idx in range(self.workers):
+            thread = threading.Thread(target=self._work, args=(self._queue,), name=f"job-worker-{idx}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        self._threads_pid = os.getpid()
+
+    def register(self, kind: str, handler: Callable[[Dict[str, Any]], Any]) -> None:
+        self._handlers[kind] = handler
+
+    def submit(self, kind: str, key: str, payload: Dict[str, Any]) -> Job:
+        if kind not in self._handlers:
+            raise ValueError(f"Unknown job kind: {kind}")
+        dedup_key = f"{kind}:{key}"
+        with self._submit_lock:
+            self._ensure_workers()
+            existing = self.store.find_active(dedup_key)
+            if existing is not None:
+                return existing
+            # Only submitters add to the queue, so it cannot fill up between this check and the put
+            if self._queue.full():
+                raise QueueFullError(f"Job queue is full ({self.queue_depth} pending jobs).")
+            job = Job(id=uuid.uuid4().hex, kind=kind, key=dedup_key, payload=payload)
+            self.store.save(job)
+            self._queue.put_nowait(job)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self.store.get(job_id)
+
+    def queue_size(self) -> int:
+        return self._queue.qsize()
+
+    def _work(self, jobs: "queue.Queue[Job]") -> None:
+        while True:
+            job = jobs.get()
+            job.status = RUNNING
+            job.started_at = time.time()
+            self.store.save(job)
+            try:
+                job.result = self._handlers[job.kind](job.payload)
+                job.status = SUCCEEDED
+            except Exception as e:
+                job.error = str(e)
+                job.status = FAILED
+            job.finished_at = time.time()
+            self.store.save(job)
+            jobs.task_done()
+
+
+def job_manager_from_env() -> JobManager:
+    """Builds the job manager from JOB_* environment variables."""
+    if os.getenv('JOB_STORE', 'memory') == 'sqlite':
+        store = SqliteJobStore(os.getenv('JOB_DB_PATH', DEFAULT_DB_PATH))
+    else:
+        store = InMemoryJobStore()
+    return JobManager(
+        store=store,
+        workers=int(os.getenv('JOB_WORKERS', 4)),
+        queue_depth=int(os.getenv('JOB_QUEUE_DEPTH', 32))
+    )
@@ -0,0 +1,212 @@
+import os
+import random
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Optional
+
+from cache import hash_key
+from chunking import estimate_tokens
+from metrics import metrics
+
+# Status codes and exception names that mean "try again later" rather than "this request is wrong"
+RETRYABLE_CODES = {429, 500, 502, 503, 504}
+RETRYABLE_ERRORS = {"ResourceExhausted", "ServiceUnavailable", "InternalServerError", "DeadlineExceeded", "TooManyRequests"}
+
+
+class DeadlineExceededError(TimeoutError):
+    """Raised when a call cannot finish, or even start, before its deadline."""
+
+
+def is_retryable(error: Exception) -> bool:
+    code = getattr(error, "code", None)
+    code = code() if callable(code) else code
+    if getattr(code, "value", code) in RETRYABLE_CODES:
+        return True
+    return type(error).__name__ in RETRYABLE_ERRORS or "429" in str(error)
+
+
+class TokenBucket:
+    """Refills at rate units per second up to capacity; acquire() blocks until enough is available."""
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.sleep = sleep
+        self._available = capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: float, deadline: float) -> None:
+        # A request bigger than the bucket could never be served, so it only waits for a full bucket
+        amount = min(amount, self.capacity)
+        while True:
+            with self._lock:
+                now = self.clock()
+                self._available = min(self.capacity, self._available + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._available >= amount:
+                    self._available -= amount
+                    return
+                wait = (amount - self._available) / self.rate
+            if now + wait > deadline:
+                raise DeadlineExceededError("Rate limit would delay the call past its deadline")
+            self.sleep(wait)
+
+
+class SlotStream:
+    """Iterates a streamed response while holding a concurrency slot. The slot is released
+    when the stream ends or fails, or when it is closed or garbage collected unread."""
+
+    def __init__(self, response: Any, release: Callable[[], None]):
+        self._release = release
+        self._released = False
+        self._lock = threading.Lock()
+        self._chunks = iter(response)
+
+    def __iter__(self) -> "SlotStream":
+        return self
+
+    def __next__(self) -> Any:
+        try:
+            return next(self._chunks)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self) -> None:
+        with self._lock:
+            if self._released:
+                return
+            self._released = True
+        self._release()
+        close = getattr(self._chunks, "close", None)
+        if close is not None:
+            close()
+
+    def __enter__(self) -> "SlotStream":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def __del__(self) -> None:
+        self.close()
+
+
+class RateLimitedModel:
+    """Wraps a Gemini-style model (anything with generate_content) for shared, bursty use.
+
+    Every call first takes one request and its estimated prompt tokens from two token
+    buckets sized to the provider quota, then waits for one of max_concurrency slots on
+    the single wrapped client, whose connection is reused by every call. Rate-limit and
+    transient errors are retried with full-jitter exponential backoff, and the whole
+    call, including waiting and retries, must finish within timeout seconds. Identical
+    prompts already in flight are coalesced so only one request is sent. clock and
+    sleep can be replaced, e.g. with a fake clock in tests.
+    """
+
+    def __init__(
+        self,
+        model: Any,
+        requests_per_minute: float = 60,
+        tokens_per_minute: float = 1_000_000,
+        max_concurrency: int = 4,
+        timeout: float = 120.0,
+        max_retries: int = 4,
+        base_backoff: float = 1.0,
+        max_backoff: float = 30.0,
+        seed: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep
+    ):
+        self.model = model
+        self.clock = clock
+        self.sleep = sleep
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        # Quotas are per minute, so each bucket holds up to one minute's worth
+        self._requests = TokenBucket(requests_per_minute / 60, requests_per_minute, clock, sleep)
+        self._tokens = TokenBucket(tokens_per_minute / 60, tokens_per_minute, clock, sleep)
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._rng = random.Random(seed)
+        self._in_flight: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def generate_content(self, prompt: str, stream: bool = False, **kwargs) -> Any:
+        if stream:
+            # Streams are consumed by one caller, so they are never shared
+            return self._call(prompt, True, kwargs)
+
+        key = hash_key(prompt, sorted(kwargs.items()))
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+        if not leader:
+            metrics.inc("llm_coalesced_total")
+            return future.result()
+
+        try:
+            future.set_result(self._call(prompt, False, kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+        return future.result()
+
+    def _call(self, prompt: str, stream: bool, kwargs: Dict[str, Any]) -> Any:
+        deadline = self.clock() + self.timeout
+        options = dict(kwargs.pop("request_options", None) or {})
+        attempt = 0
+        while True:
+            with metrics.timed("llm_throttle_wait"):
+                self._requests.acquire(1, deadline)
+                self._tokens.acquire(estimate_tokens(prompt), deadline)
+                if not self._slots.acquire(timeout=max(0.0, deadline - self.clock())):
+                    raise DeadlineExceededError("No free LLM slot before the call's deadline")
+
+            released = False
+            try:
+                # The provider call itself is cut off at whatever time the deadline leaves
+                options["timeout"] = max(0.1, deadline - self.clock())
+                response = self.model.generate_content(prompt, stream=stream, request_options=options, **kwargs)
+                if stream:
+                    # The slot is held until the caller has read, closed or dropped the stream
+                    released = True
+                    return SlotStream(response, self._slots.release)
+                return response
+            except Exception as e:
+                if not is_retryable(e) or attempt >= self.max_retries:
+                    raise
+                metrics.inc("llm_retries_total", reason=type(e).__name__)
+                backoff = self._rng.uniform(0, min(self.max_backoff, self.base_backoff * 2 ** attempt))
+                if self.clock() + backoff > deadline:
+                    raise DeadlineExceededError(f"Gave up retrying before the deadline: {e}") from e
+                attempt += 1
+            finally:
+                if not released:
+                    self._slots.release()
+            self.sleep(backoff)
+
+
+def llm_client_options_from_env() -> Dict[str, Any]:
+    """RateLimitedModel settings; match LLM_RPM and LLM_TPM to the project's quota."""
+    return {
+        "requests_per_minute": float(os.getenv('LLM_RPM', 60)),
+        "tokens_per_minute": float(os.getenv('LLM_TPM', 1_000_000)),
+        "max_concurrency": int(os.getenv('LLM_MAX_CONCURRENCY', 4)),
+        "timeout": float(os.getenv('LLM_TIMEOUT', 120)),
+        "max_retries": int(os.getenv('LLM_MAX_RETRIES', 4))
+    }
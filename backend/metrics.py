@@ -0,0 +1,153 @@
+import logging
+import os
+import random
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Latency buckets in seconds, from fast local stages up to slow LLM round trips
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+# Size buckets in characters for prompts and responses
+SIZE_BUCKETS = (100, 1000, 5000, 10000, 25000, 50000, 100000, 250000, 500000)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{value}"' for name, value in pairs) + "}"
+
+
+class _Histogram:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+
+class MetricsRegistry:
+    """Minimal Prometheus-style metrics: counters, gauges and histograms with labels,
+    plus collector callbacks that report gauges (cache hit rates, queue depths) at scrape time."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[Labels, float]] = {}
+        self._gauges: Dict[str, Dict[Labels, float]] = {}
+        self._histograms: Dict[str, Dict[Labels, _Histogram]] = {}
+        self._buckets: Dict[str, Tuple[float, ...]] = {}
+        self._help: Dict[str, str] = {}
+        self._collectors: Dict[str, Callable[[], Dict[str, Dict[Labels, float]]]] = {}
+
+    def describe(self, name: str, help_text: str) -> None:
+        self._help[name] = help_text
+
+    def inc(self, name: str, value: float = 1.0, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0.0) + value
+
+    def set_gauge(self, name: str, value: float, **labels: str) -> None:
+        with self._lock:
+            self._gauges.setdefault(name, {})[tuple(sorted(labels.items()))] = value
+
+    def observe(self, name: str, value: float, buckets: Tuple[float, ...] = DURATION_BUCKETS, **labels: str) -> None:
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            if key not in series:
+                self._buckets.setdefault(name, buckets)
+                series[key] = _Histogram(self._buckets[name])
+            series[key].observe(value)
+
+    def register_collector(self, name: str, collector: Callable[[], Dict[str, Dict[Labels, float]]]) -> None:
+        """collector returns {gauge_name: {labels_tuple: value}} and is called on every scrape.
+        Registering again under the same name replaces the earlier collector."""
+        with self._lock:
+            self._collectors[name] = collector
+
+    @contextmanager
+    def timed(self, stage: str) -> Iterator[None]:
+        """Records the duration of the enclosed block under stage_duration_seconds{stage=...}."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe("stage_duration_seconds", time.perf_counter() - started, stage=stage)
+
+    def render(self) -> str:
+        """Renders every metric in the Prometheus text exposition format."""
+        gauges: Dict[str, Dict[Labels, float]] = {}
+        with self._lock:
+            collectors = list(self._collectors.values())
+        for collector in collectors:
+            try:
+                for name, series in collector().items():
+                    gauges.setdefault(name, {}).update(series)
+            except Exception as e:
+                logging.getLogger(__name__).warning("Metrics collector failed: %s", e)
+
+        lines = []
+        with self._lock:
+            for name, series in self._counters.items():
+                lines.extend(self._header(name, "counter"))
+                lines.extend(f"{name}{_format_labels(labels)} {value}" for labels, value in series.items())
+
+            for name, series in self._gauges.items():
+                gauges.setdefault(name, {}).update(series)
+            for name, series in gauges.items():
+                lines.extend(self._header(name, "gauge"))
+                lines.extend(f"{name}{_format_labels(labels)} {value}" for labels, value in series.items())
+
+            for name, series in self._histograms.items():
+                lines.extend(self._header(name, "histogram"))
+                for labels, histogram in series.items():
+                    cumulative = 0
+                    for bound, count in zip(histogram.buckets, histogram.counts):
+                        cumulative += count
+                        lines.append(f"{name}_bucket{_format_labels(labels, ('le', str(bound)))} {cumulative}")
+                    lines.append(f"{name}_bucket{_format_labels(labels, ('le', '+Inf'))} {histogram.count}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {histogram.total}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def _header(self, name: str, kind: str) -> List[str]:
+        header = [f"# TYPE {name} {kind}"]
+        if name in self._help:
+            header.insert(0, f"# HELP {name} {self._help[name]}")
+        return header
+
+
+# Every stage timing, counter and collector lands here, so /metrics renders one worker's view
+metrics = MetricsRegistry()
+metrics.describe("stage_duration_seconds", "Wall-clock time spent in each processing stage")
+metrics.describe("payload_chars", "Size of prompts and model responses in characters")
+metrics.describe("payload_tokens_total", "Estimated prompt and response tokens")
+metrics.describe("transcript_tokens_saved_total", "Estimated transcript tokens kept out of prompts by each formatting stage")
+metrics.describe("prompt_prefix_tokens_total", "Estimated prompt tokens taken by the static, cacheable prompt prefixes")
+
+LOG_SAMPLE_RATE = float(os.getenv('LOG_SAMPLE_RATE', 0.01))
+LOG_PAYLOAD_CHARS = int(os.getenv('LOG_PAYLOAD_CHARS', 500))
+
+
+def log_sampled(logger: logging.Logger, message: str, payload: Callable[[], Any], rate: Optional[float] = None) -> None:
+    """Logs a truncated payload at DEBUG for a sample of calls.
+
+    payload is only evaluated for sampled calls, so unsampled calls cost one random() draw.
+    """
+    if not logger.isEnabledFor(logging.DEBUG) or random.random() >= (LOG_SAMPLE_RATE if rate is None else rate):
+        return
+    text = str(payload())
+    if len(text) > LOG_PAYLOAD_CHARS:
+        text = f"{text[:LOG_PAYLOAD_CHARS]}... ({len(text)} chars)"
+    logger.debug("%s: %s", message, text)
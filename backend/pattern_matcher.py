@@ -0,0 +1,137 @@
+import re
+import time
+from collections import defaultdict
+from typing import Dict, List, Set, Tuple
+
+# Patterns of the form (?i)\b(phrase|phrase|...)\b can be folded into one lookup table
+PHRASE_GROUP_PATTERN = re.compile(r"^(?:\(\?i\))?\\b\(([^()]*)\)\\b$")
+WORD_PATTERN = re.compile(r"\w+")
+
+# Pattern categories used by EnhancedContentProcessor for more nuanced analysis
+CONTENT_PATTERNS = {
+    'reasoning_patterns': [
+        r"(?i)\b(because|therefore|thus|hence|since|as a result|consequently)\b",
+        r"(?i)\b(this means|this suggests|this implies|which indicates)\b",
+        r"(?i)\b(for example|such as|specifically|in particular|notably)\b"
+    ],
+    'insight_patterns': [
+        r"(?i)\b(realize|understand|recognize|discover|learn|find that|see that)\b",
+        r"(?i)\b(interesting|fascinating|surprising|remarkable|notable)\b",
+        r"(?i)\b(in fact|actually|indeed|surprisingly|interestingly)\b"
+    ],
+    'action_patterns': [
+        r"(?i)\b(need to|should|must|have to|important to|crucial to)\b",
+        r"(?i)\b(try|implement|apply|use|develop|create|build|establish)\b",
+        r"(?i)\b(start|begin|initiate|launch|kick off|get started)\b"
+    ],
+    'comparison_patterns': [
+        r"(?i)\b(unlike|similar to|different from|compared to|in contrast)\b",
+        r"(?i)\b(while|whereas|although|however|but|yet|instead)\b",
+        r"(?i)\b(better|worse|more|less|greater|fewer|higher|lower)\b"
+    ],
+    'principle_patterns': [
+        r"(?i)\b(principle|concept|theory|framework|approach|method)\b",
+        r"(?i)\b(fundamental|basic|essential|core|key|critical)\b",
+        r"(?i)\b(always|never|typically|generally|usually|often)\b"
+    ]
+}
+
+
+class PatternMatcher:
+    """Classifies text into every pattern category in a single pass.
+
+    Patterns that are plain phrase lists are folded into one lookup table keyed by
+    lowercased phrase. The text is tokenized once and every word n-gram up to the
+    longest phrase is looked up, so overlapping matches from different categories are
+    all found, just as when each category's patterns are searched separately.
+    Patterns that are not simple phrase lists are kept as compiled regexes.
+    """
+
+    def __init__(self, patterns: Dict[str, List[str]]):
+        self._phrases: Dict[str, Set[str]] = defaultdict(set)
+        self._fallback: List[Tuple[str, "re.Pattern"]] = []
+
+        for category, category_patterns in patterns.items():
+            for pattern in category_patterns:
+                group = PHRASE_GROUP_PATTERN.match(pattern)
+                phrases = group.group(1).split("|") if group else []
+                if not phrases or not all(re.fullmatch(r"\w+(?: \w+)*", phrase) for phrase in phrases):
+                    self._fallback.append((category, re.compile(pattern)))
+                    continue
+                for phrase in phrases:
+                    self._phrases[phrase.lower()].add(category)
+
+        self._max_words = max((len(phrase.split()) for phrase in self._phrases), default=0)
+
+    def match(self, text: str) -> Dict[str, List[Tuple[int, int, str]]]:
+        """Returns the matched spans (start, end, text) for every category found in text."""
+        found: Dict[str, List[Tuple[int, int, str]]] = defaultdict(list)
+        words = [(m.start(), m.end(), m.group().lower()) for m in WORD_PATTERN.finditer(text)]
+
+        for i, (start, end, word) in enumerate(words):
+            key = word
+            last = i
+            while True:
+                categories = self._phrases.get(key)
+                if categories:
+                    for category in categories:
+                        found[category].append((start, end, text[start:end]))
+                last += 1
+                # Multi-word phrases are written with single spaces, as in the regexes
+                if last - i >= self._max_words or last >= len(words) or text[end:words[last][0]] != " ":
+                    break
+                end = words[last][1]
+                key = f"{key} {words[last][2]}"
+
+        for category, regex in self._fallback:
+            for match in regex.finditer(text):
+                found[category].append((match.start(), match.end(), match.group()))
+        return dict(found)
+
+    def categories(self, text: str) -> Set[str]:
+        """Returns the set of categories whose patterns occur in text."""
+        return set(self.match(text))
+
+
+def legacy_categories(patterns: Dict[str, List[str]], text: str) -> Set[str]:
+    """The original per-pattern loop from EnhancedContentProcessor.analyze_context."""
+    return {
+        category for category, category_patterns in patterns.items()
+        if any(re.search(pattern, text) for pattern in category_patterns)
+    }
+
+
+def benchmark(patterns: Dict[str, List[str]], sentences: List[str], repeat: int = 5) -> Dict[str, float]:
+    """Times the compiled matcher against the per-pattern loop on the same sentences."""
+    matcher = PatternMatcher(patterns)
+    for sentence in sentences:
+        assert matcher.categories(sentence) == legacy_categories(patterns, sentence), sentence
+
+    timings = {}
+    for name, classify in (
+        ("legacy_loop", lambda s: legacy_categories(patterns, s)),
+        ("compiled_matcher", matcher.categories)
+    ):
+        best = float("inf")
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for sentence in sentences:
+                classify(sentence)
+            best = min(best, time.perf_counter() - start)
+        timings[name] = best
+    timings["speedup"] = timings["legacy_loop"] / timings["compiled_matcher"]
+    return timings
+
+
+if __name__ == "__main__":
+    import os
+
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "transcript.txt")) as file:
+        words = file.read().split()
+    sentences = [" ".join(words[i:i + 20]) for i in range(0, len(words), 20)] * 20
+
+    results = benchmark(CONTENT_PATTERNS, sentences)
+    print(f"{len(sentences)} sentences")
+    print(f"legacy loop:      {results['legacy_loop'] * 1000:.1f} ms")
+    print(f"compiled matcher: {results['compiled_matcher'] * 1000:.1f} ms")
+    print(f"speedup:          {results['speedup']:.1f}x")
@@ -0,0 +1,92 @@
+import re
+from typing import Dict, List, Optional
+
+from chunking import estimate_tokens
+from pattern_matcher import CONTENT_PATTERNS, PatternMatcher
+from transcript_formatter import CompactTranscript, blocks_transcript, render_blocks
+
+# How much a match in each category says about a block being worth sending to the model
+CATEGORY_WEIGHTS = {
+    'action_patterns': 3.0,
+    'insight_patterns': 2.0,
+    'principle_patterns': 2.0,
+    'reasoning_patterns': 1.5,
+    'comparison_patterns': 1.0
+}
+# The definitional markers extract_key_concepts looks for, as whole phrases
+DEFINITION_PATTERN = re.compile(r"\b(is|means|refers to|defines|represents)\b", re.IGNORECASE)
+# Greetings, sponsor reads and calls to subscribe rarely hold anything worth extracting
+FILLER_PATTERN = re.compile(
+    r"\b(sponsor(?:ed)?|subscribe|patreon|merch|promo code|discount code|link in the description|"
+    r"notification bell|hey (?:guys|everyone)|welcome back|what's up)\b",
+    re.IGNORECASE
+)
+
+
+def score_block(text: str, matcher: PatternMatcher) -> float:
+    """Heuristic value of one transcript block: weighted pattern matches, a bonus for
+    definitional statements and a penalty for filler."""
+    score = 0.0
+    for category, matches in matcher.match(text).items():
+        score += CATEGORY_WEIGHTS.get(category, 1.0) * min(len(matches), 3)
+    if DEFINITION_PATTERN.search(text):
+        score += 0.5
+    score -= 5.0 * len(FILLER_PATTERN.findall(text))
+    return score
+
+
+def prefilter_transcript(
+    compact: CompactTranscript,
+    max_tokens: int,
+    neighbors: int = 1,
+    matcher: Optional[PatternMatcher] = None
+) -> CompactTranscript:
+    """Keeps only the highest-scoring blocks, each with up to neighbors blocks of context on
+    either side, until max_tokens is used up. Blocks stay in transcript order with their
+    timestamps, so the result can be prompted and resolved like any CompactTranscript.
+    Budget the scored blocks leave unused is filled with other blocks in order, and at
+    least the first block is always kept. Transcripts that already fit are returned unchanged."""
+    if compact.compact_tokens <= max_tokens:
+        return compact
+
+    matcher = matcher or PatternMatcher(CONTENT_PATTERNS)
+    blocks = compact.blocks
+    costs = [estimate_tokens(render_blocks([block])) + 1 for block in blocks]
+    scores = [score_block(block.text, matcher) for block in blocks]
+
+    selected = set()
+    used = 0
+    for idx in sorted(range(len(blocks)), key=lambda i: scores[i], reverse=True):
+        if scores[idx] <= 0:
+            break
+        group = [
+            i for i in range(max(0, idx - neighbors), min(len(blocks), idx + neighbors + 1))
+            if i not in selected
+        ]
+        cost = sum(costs[i] for i in group)
+        if used + cost > max_tokens:
+            continue
+        selected.update(group)
+        used += cost
+
+    # Whatever budget is left goes to the remaining blocks in transcript order, so a
+    # transcript where nothing scores above zero still sends its opening rather than nothing
+    for idx in range(len(blocks)):
+        if idx not in selected and used + costs[idx] <= max_tokens:
+            selected.add(idx)
+            used += costs[idx]
+    if not selected and blocks:
+        selected.add(0)
+
+    return blocks_transcript([blocks[i] for i in sorted(selected)], compact.original_tokens)
+
+
+def reduction_stats(original: CompactTranscript, reduced: CompactTranscript) -> Dict[str, float]:
+    """How much of the formatted transcript the pre-filter removed."""
+    return {
+        "blocks_before": len(original.blocks),
+        "blocks_after": len(reduced.blocks),
+        "tokens_before": original.compact_tokens,
+        "tokens_after": reduced.compact_tokens,
+        "reduction_ratio": 1 - reduced.compact_tokens / original.compact_tokens if original.compact_tokens else 0.0
+    }
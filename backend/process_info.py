@@ -0,0 +1,61 @@
+import os
+import resource
+import sys
+import time
+from typing import Any, Dict
+
+# Set when this module is first imported (in the master under a preloading server)
+PROCESS_STARTED_AT = time.time()
+
+_worker_started_at = None
+_worker_ready_at = None
+
+
+def mark_worker_started() -> None:
+    """Call right after a worker process is forked (e.g. from a post_fork hook)."""
+    global _worker_started_at, _worker_ready_at
+    _worker_started_at = time.time()
+    _worker_ready_at = None
+
+
+def mark_worker_ready() -> None:
+    """Call once the worker can serve requests."""
+    global _worker_ready_at
+    _worker_ready_at = time.time()
+
+
+def memory_usage() -> Dict[str, Any]:
+    """Resident memory of this process in MB.
+
+    On Linux, pss splits shared pages evenly between the processes that map them and
+    private counts pages only this process owns, which is what to size boxes by when
+    workers share preloaded models copy-on-write.
+    """
+    usage = {}
+    try:
+        with open("/proc/self/smaps_rollup") as file:
+            for line in file:
+                name, value = line.split(":", 1)
+                if name in ("Rss", "Pss", "Private_Clean", "Private_Dirty", "Shared_Clean", "Shared_Dirty"):
+                    usage[name] = int(value.split()[0]) / 1024
+        return {
+            "rss_mb": round(usage.get("Rss", 0.0), 1),
+            "pss_mb": round(usage.get("Pss", 0.0), 1),
+            "private_mb": round(usage.get("Private_Clean", 0.0) + usage.get("Private_Dirty", 0.0), 1),
+            "shared_mb": round(usage.get("Shared_Clean", 0.0) + usage.get("Shared_Dirty", 0.0), 1)
+        }
+    except (OSError, ValueError):
+        # ru_maxrss is in KB on Linux and bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return {"peak_rss_mb": round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)}
+
+
+def process_info() -> Dict[str, Any]:
+    info = {
+        "pid": os.getpid(),
+        "uptime_seconds": round(time.time() - (_worker_started_at or PROCESS_STARTED_AT), 3),
+        "memory": memory_usage()
+    }
+    if _worker_started_at is not None and _worker_ready_at is not None:
+        info["worker_startup_seconds"] = round(_worker_ready_at - _worker_started_at, 3)
+    return info
@@ -0,0 +1,32 @@
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict
+
+from chunking import estimate_tokens
+
+
+@dataclass(frozen=True)
+class PromptPrefix:
+    """The static leading part of a prompt: instructions, schema and worked example."""
+    name: str
+    text: str
+    tokens: int
+
+
+class PromptTemplateCache:
+    """Local template cache. Each prefix is rendered once, with its token count computed
+    up front, and every prompt built on it is just prefix.text + the per-request part."""
+
+    def __init__(self):
+        self._prefixes: Dict[str, PromptPrefix] = {}
+        self._lock = threading.Lock()
+
+    def get(self, name: str, render: Callable[[], str]) -> PromptPrefix:
+        prefix = self._prefixes.get(name)
+        if prefix is None:
+            with self._lock:
+                prefix = self._prefixes.get(name)
+                if prefix is None:
+                    text = render()
+                    prefix = self._prefixes[name] = PromptPrefix(name, text, estimate_tokens(text))
+        return prefix
@@ -0,0 +1,73 @@
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class LazyRegistry:
+    """Loads heavy modules and models on first use, once per process.
+
+    Components are registered with a zero-argument loader. get() runs the loader the
+    first time a component is asked for and records how long the cold start took;
+    warm_up() can load components ahead of time on a background thread.
+    """
+
+    def __init__(self):
+        self._loaders: Dict[str, Callable[[], Any]] = {}
+        self._instances: Dict[str, Any] = {}
+        self._locks: Dict[str, threading.Lock] = {}
+        self._registry_lock = threading.Lock()
+        self.timings: Dict[str, float] = {}
+
+    def register(self, name: str, loader: Callable[[], Any]) -> None:
+        with self._registry_lock:
+            self._loaders[name] = loader
+            self._locks.setdefault(name, threading.Lock())
+
+    def get(self, name: str) -> Any:
+        if name in self._instances:
+            return self._instances[name]
+        if name not in self._loaders:
+            raise KeyError(f"No component registered under '{name}'")
+        with self._locks[name]:
+            if name not in self._instances:
+                started = time.perf_counter()
+                self._instances[name] = self._loaders[name]()
+                self.timings[name] = time.perf_counter() - started
+        return self._instances[name]
+
+    def is_loaded(self, name: str) -> bool:
+        return name in self._instances
+
+    def warm_up(self, names: Optional[Iterable[str]] = None, background: bool = True) -> Optional[threading.Thread]:
+        """Loads the given components (all registered ones by default), optionally in the background."""
+        names = list(names) if names is not None else list(self._loaders)
+
+        def load_all():
+            for name in names:
+                try:
+                    self.get(name)
+                except Exception:
+                    logger.exception("Failed to warm up %s", name)
+
+        if not background:
+            load_all()
+            return None
+        thread = threading.Thread(target=load_all, name="warm-up", daemon=True)
+        thread.start()
+        return thread
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            name: {
+                "loaded": self.is_loaded(name),
+                "cold_start_seconds": round(self.timings[name], 3) if name in self.timings else None
+            }
+            for name in self._loaders
+        }
+
+
+# Heavy models and SDKs, loaded once per process on first use or by preload/warm-up
+registry = LazyRegistry()
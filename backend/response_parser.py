@@ -0,0 +1,175 @@
+import json
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Tuple
+
+# Sections of the analysis response and the field every item in them must have
+ANALYSIS_SCHEMA = {
+    "action_steps": "action",
+    "key_insights": "keyInsight",
+    "examples": "example"
+}
+SECTION_PATTERN = re.compile(r'"(%s)"\s*:\s*\[' % "|".join(ANALYSIS_SCHEMA))
+TRAILING_COMMA_PATTERN = re.compile(r",\s*([}\]])")
+
+
+@dataclass
+class ParseResult:
+    data: Dict[str, List[Dict[str, Any]]]
+    # Sections that were missing, cut off or contained items that could not be read
+    failed_sections: List[str] = field(default_factory=list)
+    # Offset in the response text where each section's array starts
+    section_offsets: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def complete(self) -> bool:
+        return not self.failed_sections
+
+    @property
+    def item_count(self) -> int:
+        return sum(len(items) for items in self.data.values())
+
+
+def _valid_item(section: str, item: Any) -> bool:
+    value = item.get(ANALYSIS_SCHEMA[section]) if isinstance(item, dict) else None
+    return isinstance(value, str) and bool(value.strip())
+
+
+def _object_end(text: str, start: int) -> Optional[int]:
+    """Index just past the object that opens at text[start], or None if it is not closed yet."""
+    depth = 0
+    in_string = False
+    escaped = False
+    for pos in range(start, len(text)):
+        char = text[pos]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char == "{":
+            depth += 1
+        elif char == "}":
+            depth -= 1
+            if depth == 0:
+                return pos + 1
+    return None
+
+
+def _load_lenient(text: str) -> Any:
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        # Trailing commas are the most common slip in model-written JSON
+        return json.loads(TRAILING_COMMA_PATTERN.sub(r"\1", text))
+
+
+class IncrementalAnalysisParser:
+    """Schema-aware parser for the action_steps / key_insights / examples response.
+
+    Text can be fed in pieces as it streams in; each feed returns the items completed
+    by that piece. Items are read one object at a time, so a response that is cut off
+    or has one broken item still yields every complete item, and close() reports which
+    sections need to be asked for again.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0
+        self._section: Optional[str] = None
+        self._closed_sections = set()
+        self._malformed_sections = set()
+        self._offsets: Dict[str, int] = {}
+        self.data: Dict[str, List[Dict[str, Any]]] = {section: [] for section in ANALYSIS_SCHEMA}
+
+    def feed(self, chunk: str) -> List[Tuple[str, Dict[str, Any]]]:
+        self._buffer += chunk
+        completed = []
+        while True:
+            if self._section is None:
+                match = SECTION_PATTERN.search(self._buffer, self._pos)
+                if match is None:
+                    break
+                self._section = match.group(1)
+                self._offsets.setdefault(self._section, match.start())
+                self._pos = match.end()
+                continue
+
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in " \t\r\n,":
+                self._pos += 1
+            if self._pos >= len(self._buffer):
+                break
+
+            char = self._buffer[self._pos]
+            if char == "]":
+                self._closed_sections.add(self._section)
+                self._section = None
+                self._pos += 1
+            elif char == "{":
+                end = _object_end(self._buffer, self._pos)
+                if end is None:
+                    # The item is still streaming in (or the response was cut off here)
+                    break
+                try:
+                    item = _load_lenient(self._buffer[self._pos:end])
+                except json.JSONDecodeError:
+                    item = None
+                if _valid_item(self._section, item):
+                    self.data[self._section].append(item)
+                    completed.append((self._section, item))
+                else:
+                    self._malformed_sections.add(self._section)
+                self._pos = end
+            else:
+                # Not an object where one should be; give up on the rest of this section
+                self._malformed_sections.add(self._section)
+                self._section = None
+        return completed
+
+    def close(self) -> ParseResult:
+        failed = [
+            section for section in ANALYSIS_SCHEMA
+            if section not in self._closed_sections or section in self._malformed_sections
+        ]
+        return ParseResult(data=self.data, failed_sections=failed, section_offsets=dict(self._offsets))
+
+
+def merge_section_items(section: str, salvaged: List[Dict[str, Any]], repaired: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Salvaged items followed by the repaired items that are not already among them,
+    so a repair that returns fewer items never loses ones that were already read."""
+    key = ANALYSIS_SCHEMA[section]
+    seen = {" ".join(item[key].lower().split()) for item in salvaged}
+    return salvaged + [item for item in repaired if " ".join(item[key].lower().split()) not in seen]
+
+
+def parse_analysis(text: str) -> ParseResult:
+    """Parses a complete response, salvaging what it can when it is not valid JSON."""
+    try:
+        parsed = json.loads(text)
+    except json.JSONDecodeError:
+        parsed = None
+    if isinstance(parsed, dict):
+        data, failed = {}, []
+        for section in ANALYSIS_SCHEMA:
+            # A valid response that leaves a section out simply has nothing for it
+            items = parsed.get(section, [])
+            if not isinstance(items, list):
+                data[section] = []
+                failed.append(section)
+                continue
+            data[section] = [item for item in items if _valid_item(section, item)]
+            if len(data[section]) != len(items):
+                failed.append(section)
+        # Offsets let a repair quote the sections with bad items instead of resending the transcript
+        offsets = {}
+        for match in SECTION_PATTERN.finditer(text):
+            offsets.setdefault(match.group(1), match.start())
+        return ParseResult(data=data, failed_sections=failed, section_offsets=offsets)
+
+    parser = IncrementalAnalysisParser()
+    parser.feed(text)
+    return parser.close()
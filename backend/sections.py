@@ -1,62 +1,197 @@
+import copy
+import multiprocessing
+import os
 import re
-import spacy
-import torch
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
-from typing import List, Dict, Tuple, Set
-import nltk
-from nltk.tokenize import sent_tokenize
-from collections import defaultdict
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, List, Dict, Tuple, Set, Union, Iterable, Iterator, Optional, TYPE_CHECKING
+from collections import defaultdict, deque
+
+from pattern_matcher import CONTENT_PATTERNS, PatternMatcher
+from metrics import metrics
+from registry import registry
+from segment_cache import SegmentCache, segment_cache_from_env
+from text_tiling import TextTilingSegmenter
+
+if TYPE_CHECKING:
+    from spacy.tokens import Doc, Span
+
+# A segment is handed around as its already-parsed sentences so nothing is parsed twice
+SegmentInput = Union[str, "Doc", "Span", List["Span"]]
+
+BART_MODEL_NAME = "facebook/bart-large-cnn"
+SUMMARY_GENERATION_KWARGS = {
+    "max_length": 200,
+    "min_length": 50,
+    "length_penalty": 2.0,
+    "num_beams": 4,
+    "early_stopping": True
+}
+
+
+# spaCy, torch and transformers are imported inside the loaders so importing this
+# module stays cheap and workers that never summarize never load BART
+def _load_spacy():
+    import spacy
+    # The lemmatizer is never used so it is left out of the pipeline
+    return spacy.load("en_core_web_sm", disable=["lemmatizer"])
+
+
+def _load_spacy_with_lemmas():
+    import spacy
+    # Only TextTilingSegmenter compares lemmas, so only it pays for the lemmatizer
+    return spacy.load("en_core_web_sm")
+
+
+def _load_bart_tokenizer():
+    from transformers import AutoTokenizer
+    return AutoTokenizer.from_pretrained(BART_MODEL_NAME)
+
+
+def _load_bart_model():
+    from transformers import AutoModelForSeq2SeqLM
+    return AutoModelForSeq2SeqLM.from_pretrained(BART_MODEL_NAME)
+
+
+def read_text_chunks(path: str, chunk_chars: int = 65536) -> Iterator[str]:
+    """Yield a text file in chunks of up to chunk_chars characters"""
+    with open(path, 'r') as file:
+        while True:
+            chunk = file.read(chunk_chars)
+            if not chunk:
+                return
+            yield chunk
+
+
+registry.register("spacy_nlp", _load_spacy)
+registry.register("spacy_nlp_lemmas", _load_spacy_with_lemmas)
+registry.register("bart_tokenizer", _load_bart_tokenizer)
+registry.register("bart_model", _load_bart_model)
 
 class EnhancedContentProcessor:
-    def __init__(self):
-        # Load required models
-        self.nlp = spacy.load("en_core_web_sm")
-        self.tokenizer = AutoTokenizer.from_pretrained("facebook/bart-large-cnn")
-        self.model = AutoModelForSeq2SeqLM.from_pretrained("facebook/bart-large-cnn")
+    # Size of the text pieces fed to nlp.pipe; keeps each Doc well under spaCy's max_length
+    PIPE_CHUNK_CHARS = 100000
+
+    def __init__(
+        self,
+        batch_size: int = 8,
+        num_threads: Optional[int] = None,
+        quantize: bool = False,
+        segment_cache: Optional[SegmentCache] = None,
+        workers: int = 1,
+        worker_threads: Optional[int] = 1,
+        summarizer: Optional[Any] = None,
+        segmenter: Optional[TextTilingSegmenter] = None
+    ):
+        """workers: analyzes segments in that many processes, each running worker_threads torch threads.
+        summarizer: replaces BatchSummarizer, e.g. with a fake; must be picklable when workers > 1.
+        segmenter: replaces the noun-overlap topic-shift rule, e.g. with TextTilingSegmenter(window=4)."""
+        # Models are loaded lazily through the registry on first use
+        self.batch_size = batch_size
+        self.num_threads = num_threads
+        self.quantize = quantize
+        self._summarizer = summarizer
+        self._summarizer_override = summarizer
+        self._summarizer_lock = threading.Lock()
+        self.workers = workers
+        self.worker_threads = worker_threads
+        self._pool = None
+        self.segmenter = segmenter
         
         # Define pattern categories for more nuanced analysis
-        self.patterns = {
-            'reasoning_patterns': [
-                r"(?i)\b(because|therefore|thus|hence|since|as a result|consequently)\b",
-                r"(?i)\b(this means|this suggests|this implies|which indicates)\b",
-                r"(?i)\b(for example|such as|specifically|in particular|notably)\b"
-            ],
-            'insight_patterns': [
-                r"(?i)\b(realize|understand|recognize|discover|learn|find that|see that)\b",
-                r"(?i)\b(interesting|fascinating|surprising|remarkable|notable)\b",
-                r"(?i)\b(in fact|actually|indeed|surprisingly|interestingly)\b"
-            ],
-            'action_patterns': [
-                r"(?i)\b(need to|should|must|have to|important to|crucial to)\b",
-                r"(?i)\b(try|implement|apply|use|develop|create|build|establish)\b",
-                r"(?i)\b(start|begin|initiate|launch|kick off|get started)\b"
-            ],
-            'comparison_patterns': [
-                r"(?i)\b(unlike|similar to|different from|compared to|in contrast)\b",
-                r"(?i)\b(while|whereas|although|however|but|yet|instead)\b",
-                r"(?i)\b(better|worse|more|less|greater|fewer|higher|lower)\b"
-            ],
-            'principle_patterns': [
-                r"(?i)\b(principle|concept|theory|framework|approach|method)\b",
-                r"(?i)\b(fundamental|basic|essential|core|key|critical)\b",
-                r"(?i)\b(always|never|typically|generally|usually|often)\b"
-            ]
-        }
+        self.patterns = CONTENT_PATTERNS
+        self.matcher = PatternMatcher(self.patterns)
+
+        # Repeated intros, outros and sponsor reads are served from here instead of re-running BART
+        self.segment_cache = segment_cache
+        self._cache_config = f"{BART_MODEL_NAME}|{sorted(SUMMARY_GENERATION_KWARGS.items())}|" \
+                             f"quantize={quantize}|{sorted(CONTENT_PATTERNS.items())}"
+
+    @property
+    def nlp(self):
+        if getattr(self.segmenter, "needs_lemmas", False):
+            return registry.get("spacy_nlp_lemmas")
+        return registry.get("spacy_nlp")
+
+    @property
+    def tokenizer(self):
+        return registry.get("bart_tokenizer")
+
+    @property
+    def summarizer(self):
+        # Summarize segments in length-bucketed batches; quantize=True uses dynamic int8 weights
+        if self._summarizer is None:
+            with self._summarizer_lock:
+                if self._summarizer is None:
+                    from summarizer import BatchSummarizer
+                    self._summarizer = BatchSummarizer(
+                        self.tokenizer,
+                        registry.get("bart_model"),
+                        batch_size=self.batch_size,
+                        num_threads=self.num_threads,
+                        quantize=self.quantize,
+                        generation_kwargs=SUMMARY_GENERATION_KWARGS
+                    )
+        return self._summarizer
+
+    @property
+    def model(self):
+        return self.summarizer.model
+
+    def _sentences(self, content: SegmentInput) -> List["Span"]:
+        """Returns sentence spans, parsing only when given raw text"""
+        if isinstance(content, str):
+            with metrics.timed("spacy_parse"):
+                return list(self.nlp(content).sents)
+        if hasattr(content, "sents"):
+            return list(content.sents)
+        return list(content)
 
-    def analyze_context(self, text: str) -> Dict[str, List[str]]:
+    def _split_text(self, text: Union[str, Iterable[str]]) -> Iterator[str]:
+        """Split text, whole or as a stream of chunks, into pieces for nlp.pipe, preferring sentence ends as cut points"""
+        chunks = [text] if isinstance(text, str) else text
+        buffer = ""
+        for chunk in chunks:
+            buffer += chunk
+            start = 0
+            while len(buffer) - start > self.PIPE_CHUNK_CHARS:
+                end = start + self.PIPE_CHUNK_CHARS
+                cut = max(buffer.rfind(". ", start, end), buffer.rfind("? ", start, end), buffer.rfind("! ", start, end))
+                if cut <= start:
+                    cut = buffer.rfind(" ", start, end)
+                if cut > start:
+                    end = cut + 1
+                yield buffer[start:end]
+                start = end
+            buffer = buffer[start:]
+        if buffer:
+            yield buffer
+
+    def parse_sentences(self, text: Union[str, Iterable[str]]) -> Iterator["Span"]:
+        """Parse text, whole or as a stream of chunks, with nlp.pipe and yield its sentences in order"""
+        # One piece per batch so the first sentences come out before the rest is read
+        docs = self.nlp.pipe(self._split_text(text), batch_size=1)
+        while True:
+            # Only the parsing is timed, not whatever the caller does between sentences
+            with metrics.timed("spacy_parse"):
+                doc = next(docs, None)
+            if doc is None:
+                return
+            yield from doc.sents
+
+    def analyze_context(self, text: SegmentInput) -> Dict[str, List[str]]:
         """Analyze the broader context and themes in the text"""
-        doc = self.nlp(text)
-        
         # Initialize containers for different types of analysis
         themes = defaultdict(list)
         
         # Analyze sentence relationships and contexts
-        for sent in doc.sents:
+        for sent in self._sentences(text):
             sent_text = sent.text.strip()
             
-            # Categorize based on pattern matching
-            for category, patterns in self.patterns.items():
-                if any(re.search(pattern, sent_text) for pattern in patterns):
+            # Categorize based on pattern matching, all categories in one pass
+            matched = self.matcher.categories(sent_text)
+            for category in self.patterns:
+                if category in matched:
                     themes[category].append(sent_text)
             
             # Extract entities and their relationships
@@ -66,12 +201,11 @@ class EnhancedContentProcessor:
 
         return dict(themes)
 
-    def extract_key_concepts(self, text: str) -> List[Dict[str, str]]:
+    def extract_key_concepts(self, text: SegmentInput) -> List[Dict[str, str]]:
         """Extract and categorize key concepts from the text"""
-        doc = self.nlp(text)
         concepts = []
         
-        for sent in doc.sents:
+        for sent in self._sentences(text):
             # Look for definitional or explanatory statements
             if any(marker in sent.text.lower() for marker in 
                   ["is", "means", "refers to", "defines", "represents"]):
@@ -88,32 +222,108 @@ class EnhancedContentProcessor:
         
         return concepts
 
-    def process_segment(self, segment: str) -> Dict:
+    def _segment_text(self, segment: SegmentInput) -> str:
+        if isinstance(segment, str):
+            return segment
+        if hasattr(segment, "text"):
+            return segment.text
+        return " ".join(sent.text for sent in segment)
+
+    def _segment_key(self, segment_text: str) -> str:
+        return SegmentCache.key(segment_text, self._cache_config)
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn rather than fork: forking a process that already runs torch's
+            # OpenMP threads can deadlock the child
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.batch_size, self.worker_threads, self.quantize, self._summarizer_override)
+            )
+        return self._pool
+
+    def close(self) -> None:
+        """Shuts down the worker processes, if any were started."""
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def _start_batch(self, segments: List[SegmentInput], segment_texts: List[str]) -> Tuple[List[Optional[str]], List[Optional[Dict]], Any]:
+        """Looks a batch of segments up in the cache and starts analyzing the misses,
+        in the process pool when workers > 1. Segments repeated within the batch are
+        analyzed once. Returns (keys, cached results, pending)."""
+        keys = [self._segment_key(text) if self.segment_cache is not None else None for text in segment_texts]
+        cached = [self.segment_cache.get(key) if key is not None else None for key in keys]
+        missing = []
+        seen = set()
+        for idx, (key, results) in enumerate(zip(keys, cached)):
+            if results is None and (key is None or key not in seen):
+                missing.append(idx)
+                seen.add(key)
+        if not missing:
+            return keys, cached, []
+
+        missing_texts = [segment_texts[idx] for idx in missing]
+        if self.workers > 1:
+            # Spans cannot cross process boundaries, so workers get the text and parse it again
+            return keys, cached, self._get_pool().submit(_analyze_in_worker, missing_texts)
+
+        # Summarize the batch in one call, then analyze each segment reusing its parsed sentences
+        summaries = self.summarizer.summarize(missing_texts)
+        return keys, cached, [
+            self._analyze_segment(segments[idx], segment_texts[idx], summary)
+            for idx, summary in zip(missing, summaries)
+        ]
+
+    def _finish_batch(self, keys: List[Optional[str]], cached: List[Optional[Dict]], pending: Any) -> List[Dict]:
+        analyzed = iter(pending.result() if isinstance(pending, Future) else pending)
+        batch_results = []
+        # Results of segments analyzed in this batch, for repeats of the same key
+        fresh: Dict[str, Dict] = {}
+        for key, results in zip(keys, cached):
+            if results is None:
+                if key is not None and key in fresh:
+                    results = copy.deepcopy(fresh[key])
+                else:
+                    results = next(analyzed)
+                    if key is not None:
+                        fresh[key] = copy.deepcopy(results)
+                        self.segment_cache.set(key, results)
+            batch_results.append(results)
+        return batch_results
+
+    def process_segment(self, segment: SegmentInput, summary: Optional[str] = None) -> Dict:
         """Process individual segments with enhanced analysis"""
-        # Generate initial summary
-        inputs = self.tokenizer.encode(
-            segment,
-            max_length=1024,
-            truncation=True,
-            return_tensors="pt"
-        )
-        
-        summary_ids = self.model.generate(
-            inputs,
-            max_length=200,
-            min_length=50,
-            length_penalty=2.0,
-            num_beams=4,
-            early_stopping=True
-        )
-        
-        summary = self.tokenizer.decode(summary_ids[0], skip_special_tokens=True)
+        segment_text = self._segment_text(segment)
+        if self.segment_cache is None:
+            return self._analyze_segment(segment, segment_text, summary)
+
+        key = self._segment_key(segment_text)
+        results = self.segment_cache.get(key)
+        if results is not None:
+            # A caller's own summary takes the place of the cached one
+            return results if summary is None else dict(results, summary=summary)
+        results = self._analyze_segment(segment, segment_text, summary)
+        # Only summaries generated here are shared with other callers
+        if summary is None:
+            self.segment_cache.set(key, results)
+        return results
+
+    def _analyze_segment(self, segment: SegmentInput, segment_text: str, summary: Optional[str]) -> Dict:
+        # Parse once and share the sentences between context analysis and concept extraction
+        sentences = self._sentences(segment)
+
+        # Generate initial summary unless it was already produced as part of a batch
+        if summary is None:
+            summary = self.summarizer.summarize([segment_text])[0]
         
         # Get context analysis
-        context = self.analyze_context(segment)
+        context = self.analyze_context(sentences)
         
         # Extract key concepts
-        concepts = self.extract_key_concepts(segment)
+        concepts = self.extract_key_concepts(sentences)
         
         # Structure the results
         results = {
@@ -129,43 +339,108 @@ class EnhancedContentProcessor:
         
         return results
 
-    def process_transcript(self, transcript_path: str) -> List[Dict]:
-        """Process the entire transcript with enhanced segmentation and analysis"""
-        with open(transcript_path, 'r') as file:
-            transcript = file.read()
-        
-        # Improved segmentation based on topic shifts and semantic boundaries
-        doc = self.nlp(transcript)
-        segments = []
+    def iter_segments(self, sentences: Iterable["Span"]) -> Iterator[List["Span"]]:
+        """Group sentences into segments on topic shifts, yielding each segment as soon as it closes"""
+        if self.segmenter is not None:
+            yield from self.segmenter.segment(sentences)
+            return
+
         current_segment = []
         current_topic = set()
         
-        for sent in doc.sents:
+        for sent in sentences:
             # Extract key entities and noun phrases from the sentence
             sent_topics = {token.text for token in sent if token.pos_ in ["NOUN", "PROPN"]}
             
             # Check for topic shift
             if current_segment and len(current_topic.intersection(sent_topics)) < 2:
-                segments.append(" ".join(current_segment))
+                yield current_segment
                 current_segment = []
                 current_topic = sent_topics
             
-            current_segment.append(sent.text)
+            current_segment.append(sent)
             current_topic.update(sent_topics)
         
         # Add the last segment
         if current_segment:
-            segments.append(" ".join(current_segment))
-        
-        # Process each segment
-        processed_segments = []
-        for idx, segment in enumerate(segments, 1):
-            results = self.process_segment(segment)
-            results["section_number"] = idx
-            results["original_text"] = segment
-            processed_segments.append(results)
-        
-        return processed_segments
+            yield current_segment
+
+    def iter_process_transcript(self, transcript_path: str) -> Iterator[Dict]:
+        """Stream analyzed sections in order while the transcript is still being read.
+
+        The file is read in chunks, parsed piece by piece and segmented incrementally, and
+        segments are analyzed in batches of batch_size, or one by one across the process
+        pool when workers > 1, so memory stays bounded by the work in flight rather than
+        growing with the transcript.
+        """
+        segments = self.iter_segments(self.parse_sentences(read_text_chunks(transcript_path)))
+        # With a process pool each segment is submitted on its own so the load spreads evenly
+        # over the workers, and up to 2 x workers segments run ahead to keep every worker busy
+        batch_size = 1 if self.workers > 1 else self.batch_size
+        max_pending = 2 * self.workers if self.workers > 1 else 0
+        pending = deque()
+        section_number = 0
+
+        def finish_oldest() -> Iterator[Dict]:
+            nonlocal section_number
+            texts, keys, cached, analyzed = pending.popleft()
+            for segment_text, results in zip(texts, self._finish_batch(keys, cached, analyzed)):
+                section_number += 1
+                results["section_number"] = section_number
+                results["original_text"] = segment_text
+                yield results
+
+        batch = []
+        for segment in segments:
+            batch.append(segment)
+            if len(batch) < batch_size:
+                continue
+            texts = [self._segment_text(segment) for segment in batch]
+            pending.append((texts, *self._start_batch(batch, texts)))
+            batch = []
+            while len(pending) > max_pending:
+                yield from finish_oldest()
+
+        if batch:
+            texts = [self._segment_text(segment) for segment in batch]
+            pending.append((texts, *self._start_batch(batch, texts)))
+        while pending:
+            yield from finish_oldest()
+
+    def process_transcript(self, transcript_path: str) -> List[Dict]:
+        """Process the entire transcript with enhanced segmentation and analysis"""
+        return list(self.iter_process_transcript(transcript_path))
+
+# Set by _init_worker inside each pool process
+_worker_processor: Optional[EnhancedContentProcessor] = None
+
+
+def _init_worker(batch_size: int, worker_threads: Optional[int], quantize: bool, summarizer: Optional[Any]) -> None:
+    """Pool initializer: loads spaCy and BART once per worker process"""
+    global _worker_processor
+    if worker_threads:
+        # Set before torch is first imported so its thread pools are sized to match
+        os.environ["OMP_NUM_THREADS"] = str(worker_threads)
+        os.environ["MKL_NUM_THREADS"] = str(worker_threads)
+    _worker_processor = EnhancedContentProcessor(
+        batch_size=batch_size,
+        num_threads=worker_threads,
+        quantize=quantize,
+        summarizer=summarizer
+    )
+    _worker_processor.nlp
+    _worker_processor.summarizer
+
+
+def _analyze_in_worker(segment_texts: List[str]) -> List[Dict]:
+    """Summarizes one batch of segments and analyzes each, inside a pool worker"""
+    processor = _worker_processor
+    summaries = processor.summarizer.summarize(segment_texts)
+    return [
+        processor._analyze_segment(text, text, summary)
+        for text, summary in zip(segment_texts, summaries)
+    ]
+
 
 def format_output(results: List[Dict]) -> str:
     """Format the analysis results in a more readable and actionable way"""
@@ -220,14 +495,31 @@ def format_output(results: List[Dict]) -> str:
 
 def main():
     # Initialize the processor
-    processor = EnhancedContentProcessor()
+    segmenter = None
+    if os.getenv('SECTIONS_SEGMENTER') == 'texttiling':
+        threshold = os.getenv('SECTIONS_TILING_THRESHOLD')
+        segmenter = TextTilingSegmenter(
+            window=int(os.getenv('SECTIONS_TILING_WINDOW', 4)),
+            threshold=float(threshold) if threshold else None
+        )
+    processor = EnhancedContentProcessor(
+        segment_cache=segment_cache_from_env(),
+        workers=int(os.getenv('SECTIONS_WORKERS', 1)),
+        worker_threads=int(os.getenv('SECTIONS_WORKER_THREADS', 1)),
+        segmenter=segmenter
+    )
     
-    # Process the transcript
-    results = processor.process_transcript('transcript.txt')
+    # Process the transcript, printing each section as soon as it is ready
+    try:
+        for section in processor.iter_process_transcript('transcript.txt'):
+            print(format_output([section]), flush=True)
+    finally:
+        processor.close()
     
-    # Format and display results
-    formatted_output = format_output(results)
-    print(formatted_output)
+    if processor.workers <= 1:
+        print(f"Summarized {processor.summarizer.stats['segments']} segments "
+              f"at {processor.summarizer.segments_per_second():.2f} segments/s")
+    print(f"Segment cache hit rate: {processor.segment_cache.hit_rate():.0%}")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,68 @@
+import copy
+import os
+import re
+import threading
+from typing import Any, Dict, Optional
+
+from cache import DiskCache, MemoryCache, TieredCache, hash_key
+
+
+def normalize_segment(text: str) -> str:
+    """Case- and whitespace-insensitive form of a segment, so repeated boilerplate hashes the same."""
+    return re.sub(r"\s+", " ", text).strip().lower()
+
+
+class SegmentCache:
+    """Memoizes EnhancedContentProcessor.process_segment results by segment text and model configuration."""
+
+    def __init__(
+        self,
+        cache_dir: Optional[str] = None,
+        max_memory_entries: int = 2048,
+        max_disk_entries: int = 50000,
+        ttl: Optional[float] = None
+    ):
+        disk = DiskCache(cache_dir, max_entries=max_disk_entries, ttl=ttl) if cache_dir else None
+        self._cache = TieredCache(MemoryCache(max_entries=max_memory_entries, ttl=ttl), disk)
+        self.lookups = 0
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(text: str, config: str) -> str:
+        return hash_key('segment', config, normalize_segment(text))
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return self._cache.stats
+
+    def hit_rate(self) -> float:
+        hits = self._cache.stats["memory_hits"] + self._cache.stats["disk_hits"]
+        return hits / self.lookups if self.lookups else 0.0
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        value = self._cache.get(key)
+        # Lookups come from job, batch and request threads at once
+        with self._lock:
+            self.lookups += 1
+            if value is None:
+                self._cache.stats["misses"] += 1
+        if value is None:
+            return None
+        # Callers add per-transcript fields such as section_number and may edit the nested
+        # lists, so every hit gets its own deep copy
+        return copy.deepcopy(value)
+
+    def set(self, key: str, results: Dict[str, Any]) -> None:
+        self._cache.set(key, copy.deepcopy(results))
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+
+def segment_cache_from_env() -> SegmentCache:
+    """Builds the segment cache; set SEGMENT_CACHE_DIR to add the disk tier."""
+    return SegmentCache(
+        cache_dir=os.getenv('SEGMENT_CACHE_DIR') or None,
+        max_memory_entries=int(os.getenv('SEGMENT_CACHE_MEMORY_ENTRIES', 2048)),
+        max_disk_entries=int(os.getenv('SEGMENT_CACHE_DISK_ENTRIES', 50000))
+    )
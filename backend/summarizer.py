@@ -0,0 +1,88 @@
+import time
+from typing import Any, Dict, List, Optional
+
+import torch
+
+from metrics import metrics
+
+
+class BatchSummarizer:
+    """Runs BART summarization over many segments at once on CPU.
+
+    Segments are sorted by token length and grouped into batches so padding stays
+    small, and each batch is generated in one call under torch.inference_mode().
+    Optionally the model's Linear layers are dynamically quantized to int8, which
+    trades a little quality for noticeably faster CPU inference.
+    """
+
+    def __init__(
+        self,
+        tokenizer,
+        model,
+        batch_size: int = 8,
+        num_threads: Optional[int] = None,
+        quantize: bool = False,
+        max_input_length: int = 1024,
+        generation_kwargs: Optional[Dict[str, Any]] = None
+    ):
+        if num_threads:
+            torch.set_num_threads(num_threads)
+        if quantize:
+            model = torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        model.eval()
+
+        self.tokenizer = tokenizer
+        self.model = model
+        self.batch_size = batch_size
+        self.max_input_length = max_input_length
+        self.generation_kwargs = generation_kwargs or {
+            "max_length": 200,
+            "min_length": 50,
+            "length_penalty": 2.0,
+            "num_beams": 4,
+            "early_stopping": True
+        }
+        self.stats = {"segments": 0, "batches": 0, "seconds": 0.0}
+
+    def summarize(self, texts: List[str]) -> List[str]:
+        """Summarizes each text, returning the summaries in input order."""
+        if not texts:
+            return []
+        started = time.perf_counter()
+
+        # Bucket by length so each batch pads to a similar size
+        lengths = [
+            len(ids) for ids in self.tokenizer(
+                texts, max_length=self.max_input_length, truncation=True
+            )["input_ids"]
+        ]
+        order = sorted(range(len(texts)), key=lambda idx: lengths[idx])
+
+        summaries: List[Optional[str]] = [None] * len(texts)
+        for offset in range(0, len(order), self.batch_size):
+            batch = order[offset:offset + self.batch_size]
+            inputs = self.tokenizer(
+                [texts[idx] for idx in batch],
+                max_length=self.max_input_length,
+                truncation=True,
+                padding=True,
+                return_tensors="pt"
+            )
+            with metrics.timed("bart_generate"), torch.inference_mode():
+                summary_ids = self.model.generate(
+                    inputs["input_ids"],
+                    attention_mask=inputs["attention_mask"],
+                    **self.generation_kwargs
+                )
+            decoded = self.tokenizer.batch_decode(summary_ids, skip_special_tokens=True)
+            for idx, summary in zip(batch, decoded):
+                summaries[idx] = summary
+            self.stats["batches"] += 1
+
+        self.stats["segments"] += len(texts)
+        metrics.inc("bart_segments_total", len(texts))
+        self.stats["seconds"] += time.perf_counter() - started
+        return summaries
+
+    def segments_per_second(self) -> float:
+        return self.stats["segments"] / self.stats["seconds"] if self.stats["seconds"] else 0.0
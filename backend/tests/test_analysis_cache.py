@@ -0,0 +1,49 @@
+from analysis_cache import AnalysisCache
+from transcript_processor import PROMPT_VERSION, PersonalDevelopmentProcessor
+
+TRANSCRIPT = [
+    {"text": "Write your goals down.", "start": 0.0},
+    {"text": "Then review them weekly.", "start": 4.5}
+]
+
+
+def test_key_ignores_whitespace_and_case():
+    noisy = [
+        {"text": "  write your   GOALS down. ", "start": 0},
+        {"text": "Then review\nthem weekly.", "start": "4.5"}
+    ]
+    assert AnalysisCache.key(noisy, "gemini-pro", "1") == AnalysisCache.key(TRANSCRIPT, "gemini-pro", "1")
+
+
+def test_key_separates_transcripts_models_and_prompt_versions():
+    shifted = [dict(TRANSCRIPT[0]), dict(TRANSCRIPT[1], start=5.0)]
+    keys = {
+        AnalysisCache.key(TRANSCRIPT, "gemini-pro", "1"),
+        AnalysisCache.key(shifted, "gemini-pro", "1"),
+        AnalysisCache.key(TRANSCRIPT, "gemini-1.5-flash", "1"),
+        AnalysisCache.key(TRANSCRIPT, "gemini-pro", "2")
+    }
+    assert len(keys) == 4
+
+
+def test_processor_keys_track_prompt_options():
+    def key(**options):
+        return PersonalDevelopmentProcessor(api_key="offline", model=object(), **options)._cache_key(TRANSCRIPT)
+
+    assert key() == AnalysisCache.key(TRANSCRIPT, "gemini-pro", PROMPT_VERSION)
+    assert len({key(), key(prefilter_tokens=500), key(prefilter_tokens=800), key(local_timestamps=True),
+                key(model_name="gemini-1.5-flash")}) == 5
+
+
+def test_disk_entries_are_shared_and_failures_are_not_cached(tmp_path):
+    key = AnalysisCache.key(TRANSCRIPT, "gemini-pro", PROMPT_VERSION)
+    AnalysisCache(cache_dir=str(tmp_path)).set(key, {"summary": "cached"})
+
+    assert AnalysisCache(cache_dir=str(tmp_path)).get(key) == {"summary": "cached"}
+
+    results = AnalysisCache()
+    calls = []
+    assert results.get_or_compute(key, lambda: calls.append(1)) is None
+    assert results.get_or_compute(key, lambda: calls.append(1) or {"summary": "fresh"}) == {"summary": "fresh"}
+    assert results.get_or_compute(key, lambda: calls.append(1)) == {"summary": "fresh"}
+    assert len(calls) == 2
@@ -0,0 +1,152 @@
+import json
+import threading
+import time
+
+import pytest
+
+import app as app_module
+from fakes import FakeGenerativeModel, synthetic_transcript
+from jobs import FAILED, RUNNING, JobManager
+from transcript_processor import PersonalDevelopmentProcessor
+
+CUES = synthetic_transcript(3)
+
+
+@pytest.fixture
+def analyzer(monkeypatch):
+    """A fresh app whose transcripts and model are local fakes, with nothing cached on disk."""
+    monkeypatch.setenv("TRANSCRIPT_CACHE_DIR", "")
+    monkeypatch.setenv("ANALYSIS_CACHE_DIR", "")
+    flask_app = app_module.create_app()
+    services = flask_app.extensions['analyzer']
+    services.transcript_cache.fetch = lambda video_id: None if video_id == "missing" else CUES
+    services.processor = PersonalDevelopmentProcessor(
+        api_key="offline", model=FakeGenerativeModel(base_latency=0, per_1k_tokens=0)
+    )
+    return flask_app.test_client(), services
+
+
+def wait_for(client, job_id, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = client.get(f"/jobs/{job_id}").get_json()
+        if job["status"] not in ("queued", "running"):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def test_job_routes_run_and_dedupe(analyzer):
+    client, _ = analyzer
+    response = client.post("/jobs", json={"YouTubeVideoID": "abc"})
+    assert response.status_code == 202
+    job_id = response.get_json()["job_id"]
+
+    job = wait_for(client, job_id)
+    assert job["status"] == "succeeded"
+    assert job["result"]["analysis"]["status"] == "success"
+
+    assert client.post("/jobs", json={}).status_code == 400
+    assert client.get("/jobs/does-not-exist").status_code == 404
+
+
+def test_failed_analysis_fails_the_job(analyzer):
+    client, services = analyzer
+
+    class FailingProcessor:
+        def process_transcript(self, transcript):
+            return {"status": "error", "message": "Failed to parse AI response. Please try again."}
+
+    services.processor = FailingProcessor()
+    job = wait_for(client, client.post("/jobs", json={"YouTubeVideoID": "abc"}).get_json()["job_id"])
+    assert job["status"] == FAILED
+    assert job["error"] == "Failed to parse AI response. Please try again."
+    assert job["result"] is None
+
+    job = wait_for(client, client.post("/jobs", json={"YouTubeVideoID": "missing"}).get_json()["job_id"])
+    assert (job["status"], job["error"]) == (FAILED, "Transcription failed.")
+
+
+def test_full_job_queue_answers_429(analyzer):
+    client, services = analyzer
+    release = threading.Event()
+    services.job_manager = JobManager(workers=1, queue_depth=1)
+    services.job_manager.register('analyze', lambda payload: release.wait(5))
+
+    running = client.post("/jobs", json={"YouTubeVideoID": "a"}).get_json()["job_id"]
+    while services.job_manager.get(running).status != RUNNING:
+        time.sleep(0.01)
+    queued = client.post("/jobs", json={"YouTubeVideoID": "b"})
+    rejected = client.post("/jobs", json={"YouTubeVideoID": "c"})
+    duplicate = client.post("/jobs", json={"YouTubeVideoID": "b"})
+    release.set()
+
+    assert queued.status_code == 202
+    assert rejected.status_code == 429
+    assert rejected.headers["Retry-After"] == "5"
+    assert duplicate.status_code == 202
+    assert duplicate.get_json()["job_id"] == queued.get_json()["job_id"]
+
+
+def sse_events(response):
+    events = []
+    for message in response.get_data(as_text=True).strip().split("\n\n"):
+        event, data = message.split("\n", 1)
+        events.append((event[len("event: "):], json.loads(data[len("data: "):])))
+    return events
+
+
+class BrokenStreamModel(FakeGenerativeModel):
+    """Streams the first piece of the summary, then loses the connection."""
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        response = super().generate_content(prompt, stream=stream, **kwargs)
+        if not stream:
+            return response
+
+        def pieces():
+            yield next(response)
+            raise ConnectionError("stream reset")
+        return pieces()
+
+
+def test_stream_sends_transcript_then_partial_then_final_results(analyzer):
+    client, _ = analyzer
+    events = sse_events(client.get("/stream-analysis?YouTubeVideoID=abc"))
+    names = [event for event, _ in events]
+
+    assert names[0] == "transcript"
+    assert names.index("summary_delta") == 1
+    assert names[names.index("summary"):] == ["summary", "action_steps", "key_insights", "examples", "done"]
+    done = events[-1][1]
+    assert "".join(data for event, data in events if event == "summary_delta") == done["summary"]
+    assert done["action_steps"] and "errors" not in done
+
+
+def test_stream_reports_a_model_failure_mid_stream(analyzer):
+    client, services = analyzer
+    services.processor = PersonalDevelopmentProcessor(
+        api_key="offline", model=BrokenStreamModel(base_latency=0, per_1k_tokens=0)
+    )
+    events = sse_events(client.get("/stream-analysis?YouTubeVideoID=abc"))
+
+    assert [event for event, _ in events].count("summary_delta") == 1
+    done = events[-1]
+    assert done[0] == "done"
+    assert done[1]["errors"] == {"summary": "stream reset"}
+    # The extraction ran on its own and is still delivered
+    assert done[1]["action_steps"]
+
+
+def test_stream_sends_an_error_event_when_nothing_can_be_analyzed(analyzer):
+    client, services = analyzer
+    assert sse_events(client.get("/stream-analysis?YouTubeVideoID=missing")) == [
+        ("error", {"message": "Transcription failed."})
+    ]
+
+    # Long transcripts go through map-reduce; when every call fails the stream ends with an error
+    services.processor = PersonalDevelopmentProcessor(
+        api_key="offline", model=FakeGenerativeModel(base_latency=0, error_rate=1.0), chunk_tokens=200
+    )
+    events = sse_events(client.get("/stream-analysis?YouTubeVideoID=abc"))
+    assert [event for event, _ in events] == ["transcript", "error"]
@@ -0,0 +1,88 @@
+import threading
+import time
+
+from batch import BatchRunner
+
+
+class Tracker:
+    """Counts calls and the most that were ever running at once."""
+
+    def __init__(self, seconds=0.01):
+        self.seconds = seconds
+        self.calls = 0
+        self.running = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, value):
+        with self._lock:
+            self.calls += 1
+            self.running += 1
+            self.peak = max(self.peak, self.running)
+        time.sleep(self.seconds)
+        with self._lock:
+            self.running -= 1
+        return value
+
+
+def fetcher(tracker):
+    def fetch(video_id):
+        tracker(video_id)
+        if video_id == "missing":
+            return None
+        return {"structured_transcript": [{"text": video_id, "start": 0}]}
+    return fetch
+
+
+def analyzer(tracker):
+    def analyze(transcript):
+        tracker(transcript)
+        if transcript[0]["text"] == "broken":
+            raise RuntimeError("model unavailable")
+        return {"status": "success", "data": {"summary": transcript[0]["text"]}}
+    return analyze
+
+
+def test_results_respect_both_caps_and_end_with_stats():
+    fetches, analyses = Tracker(), Tracker(seconds=0.02)
+    runner = BatchRunner(fetcher(fetches), analyzer(analyses), fetch_concurrency=4, analysis_concurrency=2)
+    video_ids = [f"v{idx}" for idx in range(12)] + ["missing", "broken", "v0"]
+
+    *results, stats = runner.run(video_ids)
+
+    assert sorted(result["video_id"] for result in results) == sorted(set(video_ids))
+    by_id = {result["video_id"]: result for result in results}
+    assert by_id["v3"] == {"type": "result", "video_id": "v3", "status": "success", "data": {"summary": "v3"}}
+    assert by_id["missing"]["message"] == "Transcription failed."
+    assert by_id["broken"]["message"] == "model unavailable"
+    assert fetches.peak <= 4 and analyses.peak <= 2
+    assert stats["type"] == "stats"
+    assert (stats["videos"], stats["succeeded"], stats["failed"]) == (14, 12, 2)
+    assert stats["avg_analysis_seconds"] >= 0.02
+
+
+def test_analysis_cap_is_shared_by_concurrent_batches():
+    analyses = Tracker(seconds=0.02)
+    runner = BatchRunner(fetcher(Tracker(0)), analyzer(analyses), fetch_concurrency=8, analysis_concurrency=2)
+    threads = [threading.Thread(target=lambda n=n: list(runner.run([f"{n}-{idx}" for idx in range(6)])))
+               for n in range(3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(10)
+
+    assert analyses.calls == 18
+    assert analyses.peak <= 2
+
+
+def test_disconnected_client_stops_pending_analyses():
+    analyses = Tracker(seconds=0.05)
+    runner = BatchRunner(fetcher(Tracker(0)), analyzer(analyses), fetch_concurrency=8, analysis_concurrency=1)
+
+    results = runner.run([f"v{idx}" for idx in range(10)])
+    assert next(results)["status"] == "success"
+    results.close()
+    time.sleep(0.3)
+
+    # At most the analysis that was already running when the client left also finishes
+    assert analyses.calls <= 2
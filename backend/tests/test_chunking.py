@@ -0,0 +1,66 @@
+from chunking import chunk_transcript, estimate_tokens, format_cue, merge_analyses, merge_items
+
+TRANSCRIPT = [{"text": f"sentence number {idx} about building better habits", "start": float(idx * 3)}
+              for idx in range(60)]
+
+
+def cost(window):
+    return sum(estimate_tokens(format_cue(item)) + 1 for item in window)
+
+
+def test_windows_cover_the_transcript_in_order_within_budget():
+    windows = chunk_transcript(TRANSCRIPT, max_tokens=120, overlap_tokens=30)
+
+    assert len(windows) > 1
+    assert windows[0][0] is TRANSCRIPT[0]
+    assert windows[-1][-1] is TRANSCRIPT[-1]
+    assert all(cost(window) <= 120 for window in windows)
+
+    seen = []
+    for previous, window in zip(windows, windows[1:]):
+        overlap = [item for item in window if item in previous]
+        # The overlap is a prefix of the next window, within budget, and the window still moves forward
+        assert window[:len(overlap)] == overlap
+        assert cost(overlap) <= 30
+        assert len(overlap) < len(window)
+    for window in windows:
+        seen.extend(item for item in window if item not in seen)
+    assert seen == TRANSCRIPT
+
+
+def test_short_transcript_is_one_window():
+    assert chunk_transcript(TRANSCRIPT[:3], max_tokens=1000) == [TRANSCRIPT[:3]]
+
+
+def test_oversized_cue_gets_its_own_window():
+    long_cue = {"text": "word " * 400, "start": 0.0}
+    windows = chunk_transcript([long_cue] + TRANSCRIPT[:2], max_tokens=50, overlap_tokens=20)
+    assert windows[0] == [long_cue]
+    assert windows[-1][-1] is TRANSCRIPT[1]
+
+
+def test_merge_round_trip_restores_the_single_window_result():
+    full = {
+        "action_steps": [{"action": "Write your goals down", "timestamp": "3"},
+                         {"action": "Walk for twenty minutes every morning", "timestamp": "40"},
+                         {"action": "Review the week on Sunday", "timestamp": "90"}],
+        "key_insights": [{"keyInsight": "Motivation follows action", "timestamp": "12"},
+                         {"keyInsight": "Small habits compound", "timestamp": "70"}],
+        "examples": [{"example": "A runner logging every mile", "timestamp": "55"}]
+    }
+    # Each window reports what it saw; items inside the overlap are reported twice,
+    # the second time with slightly different wording
+    windows = [
+        {"action_steps": full["action_steps"][:2], "key_insights": full["key_insights"][:1]},
+        {"action_steps": [{"action": "walk for twenty minutes every morning.", "timestamp": "41"},
+                          full["action_steps"][2]],
+         "key_insights": full["key_insights"][1:], "examples": full["examples"]}
+    ]
+
+    assert merge_analyses(list(reversed(windows))) == full
+
+
+def test_merge_keeps_distinct_items_and_drops_empty_ones():
+    merged = merge_items([[{"action": "Sleep eight hours"}, {"action": ""}],
+                          [{"action": "Sleep less"}]], "action")
+    assert [item["action"] for item in merged] == ["Sleep eight hours", "Sleep less"]
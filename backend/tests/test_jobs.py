@@ -0,0 +1,106 @@
+import subprocess
+import sys
+import threading
+import time
+
+import pytest
+
+from jobs import FAILED, QUEUED, RUNNING, SUCCEEDED, InMemoryJobStore, Job, JobManager, QueueFullError, SqliteJobStore
+
+
+def wait_for(manager, job_id, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = manager.get(job_id)
+        if job.status not in (QUEUED, RUNNING):
+            return job
+        time.sleep(0.01)
+    raise AssertionError(f"job {job_id} did not finish")
+
+
+def dead_pid():
+    process = subprocess.Popen([sys.executable, "-c", "pass"])
+    process.wait()
+    return process.pid
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    return InMemoryJobStore() if request.param == "memory" else SqliteJobStore(str(tmp_path / "jobs.sqlite3"))
+
+
+def test_jobs_run_and_record_results_and_errors(store):
+    manager = JobManager(store=store, workers=2)
+    manager.register("double", lambda payload: payload["n"] * 2)
+    manager.register("fail", lambda payload: 1 / 0)
+
+    ok = wait_for(manager, manager.submit("double", "a", {"n": 21}).id)
+    failed = wait_for(manager, manager.submit("fail", "b", {}).id)
+
+    assert (ok.status, ok.result) == (SUCCEEDED, 42)
+    assert failed.status == FAILED
+    assert "division by zero" in failed.error
+
+
+def test_duplicate_submissions_share_the_active_job(store):
+    release = threading.Event()
+    manager = JobManager(store=store, workers=1)
+    manager.register("slow", lambda payload: release.wait(5))
+
+    first = manager.submit("slow", "video", {})
+    second = manager.submit("slow", "video", {})
+    other = manager.submit("slow", "other", {})
+    assert second.id == first.id
+    assert other.id != first.id
+
+    release.set()
+    wait_for(manager, first.id)
+    # A finished job no longer absorbs new submissions
+    assert manager.submit("slow", "video", {}).id != first.id
+
+
+def test_full_queue_rejects_new_jobs():
+    release = threading.Event()
+    manager = JobManager(workers=1, queue_depth=1)
+    manager.register("slow", lambda payload: release.wait(5))
+
+    running = manager.submit("slow", "a", {})
+    while manager.get(running.id).status != RUNNING:
+        time.sleep(0.01)
+    manager.submit("slow", "b", {})
+    with pytest.raises(QueueFullError):
+        manager.submit("slow", "c", {})
+    # Duplicates of a queued job are still answered
+    assert manager.submit("slow", "b", {}).status == QUEUED
+
+    release.set()
+    with pytest.raises(ValueError):
+        manager.submit("unknown", "d", {})
+
+
+def test_sqlite_marks_jobs_of_a_dead_process_failed(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    store = SqliteJobStore(path)
+    orphan = Job(id="orphan", kind="analyze", key="analyze:video", payload={}, status=RUNNING)
+    store.save(orphan)
+    store.save(Job(id="mine", kind="analyze", key="analyze:other", payload={}, status=QUEUED))
+    store._connection().execute("UPDATE jobs SET owner = ? WHERE id = 'orphan'", (dead_pid(),))
+    store._connection().commit()
+
+    reopened = SqliteJobStore(path)
+    assert reopened.find_active("analyze:video") is None
+    job = reopened.get("orphan")
+    assert job.status == FAILED
+    assert "stopped" in job.error
+    # Jobs owned by a live process are left alone
+    assert reopened.get("mine").status == QUEUED
+    assert reopened.find_active("analyze:other").id == "mine"
+
+
+def test_sqlite_results_survive_a_new_store(tmp_path):
+    path = str(tmp_path / "jobs.sqlite3")
+    manager = JobManager(store=SqliteJobStore(path), workers=1)
+    manager.register("echo", lambda payload: payload)
+    job = wait_for(manager, manager.submit("echo", "x", {"value": [1, 2]}).id)
+
+    assert SqliteJobStore(path).get(job.id).result == {"value": [1, 2]}
@@ -0,0 +1,201 @@
+import gc
+import random
+import threading
+
+import pytest
+
+from llm_client import DeadlineExceededError, RateLimitedModel, TokenBucket, is_retryable
+from metrics import metrics
+
+
+class FakeClock:
+    """Time that only moves when something sleeps."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class RateLimitError(Exception):
+    pass
+
+
+class Response:
+    def __init__(self, text):
+        self.text = text
+
+
+class FlakyModel:
+    """Fails with a 429 for the first failures calls, then answers."""
+
+    def __init__(self, failures=0, error=None):
+        self.failures = failures
+        self.error = error or RateLimitError("429 Resource has been exhausted")
+        self.calls = 0
+        self.timeouts = []
+
+    def generate_content(self, prompt, stream=False, request_options=None, **kwargs):
+        self.calls += 1
+        self.timeouts.append(request_options["timeout"])
+        if self.calls <= self.failures:
+            raise self.error
+        if stream:
+            return iter([Response("a"), Response("b")])
+        return Response(f"answer to {prompt}")
+
+
+def client(model, clock, **options):
+    return RateLimitedModel(model, seed=7, clock=clock, sleep=clock.sleep, **options)
+
+
+def test_is_retryable():
+    assert is_retryable(RateLimitError("429 Too Many Requests"))
+    assert is_retryable(type("ServiceUnavailable", (Exception,), {})())
+    assert not is_retryable(ValueError("invalid argument"))
+
+
+def test_retries_use_full_jitter_exponential_backoff():
+    clock = FakeClock()
+    model = FlakyModel(failures=3)
+    wrapped = client(model, clock, base_backoff=1.0, max_backoff=3.0, max_retries=4)
+
+    assert wrapped.generate_content("hi").text == "answer to hi"
+
+    rng = random.Random(7)
+    expected = [rng.uniform(0, min(3.0, 1.0 * 2 ** attempt)) for attempt in range(3)]
+    assert clock.sleeps == pytest.approx(expected)
+    assert model.calls == 4
+
+
+def test_gives_up_after_max_retries():
+    clock = FakeClock()
+    model = FlakyModel(failures=10)
+    wrapped = client(model, clock, base_backoff=0.01, max_retries=2)
+
+    with pytest.raises(RateLimitError):
+        wrapped.generate_content("hi")
+    assert model.calls == 3
+
+
+def test_non_retryable_errors_are_raised_at_once():
+    clock = FakeClock()
+    model = FlakyModel(failures=1, error=ValueError("bad prompt"))
+
+    with pytest.raises(ValueError):
+        client(model, clock).generate_content("hi")
+    assert clock.sleeps == []
+    assert model.calls == 1
+
+
+def test_retries_stop_at_the_deadline():
+    clock = FakeClock()
+    model = FlakyModel(failures=100)
+    wrapped = client(model, clock, timeout=10.0, base_backoff=2.0, max_backoff=8.0, max_retries=100)
+
+    with pytest.raises(DeadlineExceededError):
+        wrapped.generate_content("hi")
+
+    assert clock.now <= 10.0
+    # Each attempt is told how much of the deadline is left
+    assert model.timeouts[0] == pytest.approx(10.0)
+    assert model.timeouts == sorted(model.timeouts, reverse=True)
+
+
+def test_request_bucket_throttles_and_respects_the_deadline():
+    clock = FakeClock()
+    model = FlakyModel()
+    wrapped = client(model, clock, requests_per_minute=60, timeout=5.0)
+
+    for idx in range(60):
+        wrapped.generate_content(f"prompt {idx}")
+    assert clock.sleeps == []
+
+    # The bucket is empty, so the next call waits for one request's worth of refill
+    wrapped.generate_content("one more")
+    assert clock.sleeps == pytest.approx([1.0])
+
+    slow = client(FlakyModel(), FakeClock(), requests_per_minute=1, timeout=5.0)
+    slow.generate_content("first")
+    with pytest.raises(DeadlineExceededError):
+        slow.generate_content("second")
+
+
+def test_token_bucket_caps_oversized_requests():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=10, capacity=100, clock=clock, sleep=clock.sleep)
+    bucket.acquire(500, deadline=100)
+    bucket.acquire(50, deadline=100)
+    assert clock.sleeps == pytest.approx([5.0])
+
+
+def test_identical_prompts_in_flight_are_coalesced():
+    entered = threading.Event()
+    release = threading.Event()
+
+    class SlowModel:
+        calls = 0
+
+        def generate_content(self, prompt, stream=False, **kwargs):
+            SlowModel.calls += 1
+            entered.set()
+            release.wait(5)
+            return Response(prompt.upper())
+
+    wrapped = RateLimitedModel(SlowModel())
+    results = []
+
+    def call():
+        results.append(wrapped.generate_content("same").text)
+
+    before = metrics._counters.get("llm_coalesced_total", {}).get((), 0)
+    leader = threading.Thread(target=call)
+    leader.start()
+    entered.wait(5)
+    followers = [threading.Thread(target=call) for _ in range(4)]
+    for thread in followers:
+        thread.start()
+    # Let every follower join the in-flight call before the leader finishes
+    while metrics._counters.get("llm_coalesced_total", {}).get((), 0) - before < 4:
+        threading.Event().wait(0.01)
+    release.set()
+    for thread in [leader] + followers:
+        thread.join(5)
+
+    assert SlowModel.calls == 1
+    assert results == ["SAME"] * 5
+
+
+def test_stream_holds_its_slot_until_read():
+    clock = FakeClock()
+    wrapped = client(FlakyModel(), clock, max_concurrency=1, timeout=0.05)
+
+    stream = wrapped.generate_content("hi", stream=True)
+    next(stream)
+    with pytest.raises(DeadlineExceededError):
+        wrapped.generate_content("other")
+
+    list(stream)
+    assert wrapped.generate_content("other").text == "answer to other"
+
+
+def test_abandoned_stream_releases_its_slot():
+    wrapped = client(FlakyModel(), FakeClock(), max_concurrency=1, timeout=0.05)
+
+    stream = wrapped.generate_content("hi", stream=True)
+    del stream
+    gc.collect()
+    assert wrapped.generate_content("other").text == "answer to other"
+
+    with wrapped.generate_content("hi", stream=True):
+        pass
+    stream = wrapped.generate_content("hi", stream=True)
+    stream.close()
+    stream.close()
+    assert wrapped.generate_content("again").text == "answer to again"
@@ -0,0 +1,57 @@
+import os
+import re
+
+from pattern_matcher import CONTENT_PATTERNS, PatternMatcher, legacy_categories
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+EDGE_CASES = [
+    "",
+    "Nothing to see here.",
+    "As a result, we kick off the project.",
+    "We kick  off the project with two spaces.",
+    "Kick-off meetings and find-that notes.",
+    "BECAUSE I SAID SO",
+    "the starting point, started early, unstoppable",
+    "In fact, this implies a framework; however, it's essential.",
+    "trying tried tries try.",
+    "see that\nsee\tthat",
+    "resultant consequence; consequently."
+]
+
+
+def transcript_sentences():
+    sentences = []
+    for name in ("transcript.txt", "transcript1.txt", "transcript2.txt", "transcript3.txt"):
+        with open(os.path.join(BACKEND_DIR, name)) as file:
+            words = file.read().split()
+        sentences.extend(" ".join(words[i:i + 20]) for i in range(0, len(words), 20))
+    return sentences
+
+
+def test_one_pass_categories_match_the_per_pattern_loop():
+    matcher = PatternMatcher(CONTENT_PATTERNS)
+    for sentence in EDGE_CASES + transcript_sentences():
+        assert matcher.categories(sentence) == legacy_categories(CONTENT_PATTERNS, sentence), sentence
+
+
+def test_every_regex_match_is_reported():
+    matcher = PatternMatcher(CONTENT_PATTERNS)
+    for sentence in EDGE_CASES:
+        found = matcher.match(sentence)
+        for category, patterns in CONTENT_PATTERNS.items():
+            for pattern in patterns:
+                for match in re.finditer(pattern, sentence):
+                    assert (match.start(), match.end(), match.group()) in found[category], (pattern, sentence)
+
+
+def test_patterns_that_are_not_phrase_lists_fall_back_to_regex():
+    patterns = {
+        "numbers": [r"\d+ (?:steps|habits)"],
+        "greeting": [r"(?i)\b(hello|good morning)\b"]
+    }
+    matcher = PatternMatcher(patterns)
+    text = "Good morning! Here are 7 habits."
+
+    assert matcher.categories(text) == legacy_categories(patterns, text) == {"numbers", "greeting"}
+    assert matcher.match(text)["numbers"] == [(23, 31, "7 habits")]
@@ -0,0 +1,47 @@
+from chunking import estimate_tokens
+from prefilter import prefilter_transcript, score_block
+from pattern_matcher import CONTENT_PATTERNS, PatternMatcher
+from transcript_formatter import compact_transcript
+
+
+def cues(texts, seconds_per_cue=5):
+    return [{"text": text, "start": idx * seconds_per_cue, "duration": seconds_per_cue} for idx, text in enumerate(texts)]
+
+
+FILLER = "Hey guys, welcome back to the channel, make sure to subscribe."
+USEFUL = "You should start every morning by writing down your goals because it keeps you focused."
+
+
+def test_short_transcript_is_returned_unchanged():
+    compact = compact_transcript(cues([USEFUL, FILLER]))
+    assert prefilter_transcript(compact, max_tokens=10000) is compact
+
+
+def test_reduced_transcript_stays_within_budget_and_keeps_useful_blocks():
+    compact = compact_transcript(cues([FILLER] * 200 + [USEFUL] + [FILLER] * 200))
+    reduced = prefilter_transcript(compact, max_tokens=200)
+
+    assert reduced.compact_tokens <= 200
+    assert any(USEFUL in block.text for block in reduced.blocks)
+    assert [block.start for block in reduced.blocks] == sorted(block.start for block in reduced.blocks)
+    assert reduced.original_tokens == compact.original_tokens
+
+
+def test_all_non_positive_scores_still_fill_the_budget():
+    compact = compact_transcript(cues([FILLER] * 2000))
+    matcher = PatternMatcher(CONTENT_PATTERNS)
+    assert all(score_block(block.text, matcher) <= 0 for block in compact.blocks)
+
+    reduced = prefilter_transcript(compact, max_tokens=500)
+
+    assert reduced.blocks
+    assert reduced.text
+    assert reduced.blocks[0] is compact.blocks[0]
+    assert 0 < estimate_tokens(reduced.text) <= 500
+
+
+def test_first_block_is_kept_even_when_nothing_fits():
+    compact = compact_transcript(cues([FILLER] * 50))
+    reduced = prefilter_transcript(compact, max_tokens=1)
+
+    assert reduced.blocks == compact.blocks[:1]
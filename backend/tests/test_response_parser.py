@@ -0,0 +1,151 @@
+import json
+
+from response_parser import IncrementalAnalysisParser, merge_section_items, parse_analysis
+from transcript_processor import PersonalDevelopmentProcessor
+
+COMPLETE = {
+    "action_steps": [
+        {"action": "Write your goals down", "explanation": "Keeps them in view.", "timestamp": "1"},
+        {"action": "Walk every day", "explanation": "Clears the head.", "timestamp": "2"}
+    ],
+    "key_insights": [{"keyInsight": "Motivation follows action", "timestamp": "3"}],
+    "examples": [{"example": "Students tracking habits", "timestamp": "4"}]
+}
+
+
+class ScriptedModel:
+    """Returns the given responses in order and records every prompt."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.prompts = []
+
+    def generate_content(self, prompt, stream=False, **kwargs):
+        self.prompts.append(prompt)
+        return type("Response", (), {"text": self.responses.pop(0)})()
+
+
+def processor(model):
+    return PersonalDevelopmentProcessor(api_key="offline", model=model, concurrent=False)
+
+
+def test_valid_json_is_complete():
+    result = parse_analysis(json.dumps(COMPLETE))
+    assert result.complete
+    assert result.data == COMPLETE
+
+
+def test_missing_section_in_valid_json_is_empty_not_failed():
+    result = parse_analysis(json.dumps({"action_steps": COMPLETE["action_steps"]}))
+    assert result.complete
+    assert result.data["examples"] == []
+
+
+def test_truncated_json_keeps_complete_items():
+    text = json.dumps(COMPLETE)
+    cut = text.index('"Walk every day"') + 5
+    result = parse_analysis(text[:cut])
+
+    assert result.data["action_steps"] == COMPLETE["action_steps"][:1]
+    assert result.failed_sections == ["action_steps", "key_insights", "examples"]
+    assert result.section_offsets["action_steps"] == text.index('"action_steps"')
+
+
+def test_malformed_item_fails_only_its_section():
+    text = json.dumps(COMPLETE).replace('{"keyInsight"', '{"keyInsight": 5, "x"', 1)
+    result = parse_analysis(text)
+
+    assert result.failed_sections == ["key_insights"]
+    assert result.data["action_steps"] == COMPLETE["action_steps"]
+    assert result.data["examples"] == COMPLETE["examples"]
+
+
+def test_trailing_commas_are_tolerated():
+    text = json.dumps(COMPLETE).replace('"timestamp": "4"}', '"timestamp": "4",}', 1)
+    assert parse_analysis(text).complete
+
+
+def test_incremental_feed_yields_items_as_they_complete():
+    text = json.dumps(COMPLETE)
+    parser = IncrementalAnalysisParser()
+    completed = []
+    for offset in range(0, len(text), 7):
+        completed.extend(parser.feed(text[offset:offset + 7]))
+
+    assert [section for section, _ in completed] == ["action_steps", "action_steps", "key_insights", "examples"]
+    assert parser.close().complete
+
+
+def test_merge_keeps_salvaged_items_and_adds_new_ones():
+    salvaged = COMPLETE["action_steps"][:1]
+    repaired = [{"action": "write your GOALS down"}, {"action": "Sleep eight hours"}]
+    merged = merge_section_items("action_steps", salvaged, repaired)
+    assert [item["action"] for item in merged] == ["Write your goals down", "Sleep eight hours"]
+
+
+def test_repair_asks_only_for_failed_sections():
+    text = json.dumps(COMPLETE)
+    truncated = text[:text.index('"examples"') + 30]
+    repaired = json.dumps({"examples": COMPLETE["examples"]})
+    model = ScriptedModel(repaired)
+
+    data, failed = processor(model)._parse_analysis(truncated, "transcript text")
+
+    assert failed == []
+    assert data == COMPLETE
+    assert len(model.prompts) == 1
+    assert '"examples"' in model.prompts[0]
+    assert '"action_steps"' not in model.prompts[0].split("This is the part to fix")[0]
+
+
+def test_repair_that_returns_fewer_items_does_not_lose_salvaged_ones():
+    text = json.dumps(COMPLETE)
+    # The first action step is read, then the response breaks inside the second
+    truncated = text[:text.index('"Walk every day"')]
+    worse = json.dumps({
+        "action_steps": [],
+        "key_insights": COMPLETE["key_insights"],
+        "examples": COMPLETE["examples"]
+    })
+    model = ScriptedModel(worse)
+
+    data, failed = processor(model)._parse_analysis(truncated, "transcript text")
+
+    assert data["action_steps"] == COMPLETE["action_steps"][:1]
+    assert data["key_insights"] == COMPLETE["key_insights"]
+    assert failed == []
+
+
+def test_broken_repair_keeps_the_salvage_and_reports_failure():
+    text = json.dumps(COMPLETE)
+    truncated = text[:text.index('"Walk every day"')]
+    model = ScriptedModel("not json at all")
+
+    data, failed = processor(model)._parse_analysis(truncated, "transcript text")
+
+    assert data["action_steps"] == COMPLETE["action_steps"][:1]
+    assert failed == ["action_steps", "key_insights", "examples"]
+
+
+def test_repair_disabled_returns_salvage_without_calling_the_model():
+    model = ScriptedModel()
+    proc = PersonalDevelopmentProcessor(api_key="offline", model=model, repair_responses=False)
+    data, failed = proc._parse_analysis(json.dumps(COMPLETE)[:60], "transcript text")
+
+    assert model.prompts == []
+    assert "action_steps" in failed
+
+
+def test_valid_json_with_a_bad_item_quotes_the_section_not_the_transcript():
+    text = json.dumps(dict(COMPLETE, key_insights=[{"timestamp": "3"}] + COMPLETE["key_insights"]))
+    result = parse_analysis(text)
+    assert result.failed_sections == ["key_insights"]
+    assert result.section_offsets["key_insights"] == text.index('"key_insights"')
+
+    model = ScriptedModel(json.dumps({"key_insights": COMPLETE["key_insights"]}))
+    data, failed = processor(model)._parse_analysis(text, "transcript text")
+
+    assert failed == []
+    assert data == COMPLETE
+    assert "transcript text" not in model.prompts[0]
+    assert '{"timestamp": "3"}' in model.prompts[0]
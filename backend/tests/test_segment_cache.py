@@ -0,0 +1,45 @@
+import pytest
+
+from fakes import FakeSummarizer
+from segment_cache import SegmentCache
+
+INTRO = "Welcome back to the channel. "
+LESSON = "Write your goals down every morning. "
+
+
+def test_hits_are_independent_deep_copies():
+    cache = SegmentCache()
+    results = {"summary": "goals", "key_concepts": ["goals"], "insights": [{"text": "write it down"}]}
+    key = SegmentCache.key("  Write your GOALS down. ", "config")
+    cache.set(key, results)
+    results["key_concepts"].append("changed after set")
+
+    first = cache.get(SegmentCache.key("write your goals down.", "config"))
+    first["section_number"] = 1
+    first["key_concepts"].append("habits")
+    first["insights"][0]["text"] = "edited"
+
+    assert cache.get(key) == {"summary": "goals", "key_concepts": ["goals"], "insights": [{"text": "write it down"}]}
+    assert cache.get("missing") is None
+    assert cache.hit_rate() == pytest.approx(2 / 3)
+
+
+def test_repeated_segments_are_analyzed_once_and_returned_separately(tmp_path):
+    pytest.importorskip("spacy")
+    from sections import EnhancedContentProcessor
+
+    summarizer = FakeSummarizer()
+    processor = EnhancedContentProcessor(batch_size=4, segment_cache=SegmentCache(), summarizer=summarizer)
+    path = tmp_path / "transcript.txt"
+    path.write_text(INTRO + LESSON + INTRO + LESSON + INTRO)
+
+    sections = processor.process_transcript(str(path))
+    intros = [section for section in sections if section["original_text"].startswith("Welcome")]
+    assert len(intros) == 3
+    # Each distinct segment reaches the summarizer once, in its own batch or from the cache
+    assert summarizer.stats["segments"] == 2
+
+    intros[0]["key_concepts"].append("edited")
+    assert [section["section_number"] for section in sections] == list(range(1, len(sections) + 1))
+    assert all("edited" not in section["key_concepts"] for section in intros[1:])
+    assert "edited" not in processor.process_segment(INTRO)["key_concepts"]
@@ -0,0 +1,71 @@
+import sys
+import threading
+
+import numpy as np
+import pytest
+
+from text_tiling import TextTilingSegmenter
+
+spacy = pytest.importorskip("spacy")
+
+GARDEN = "Tomatoes need sun and water in the garden. Garden soil feeds tomatoes and peppers. " \
+         "Water the peppers and tomatoes at dawn. Mulch keeps garden soil and water in place. "
+MONEY = "Budgets track income and spending every month. Savings grow when spending stays under income. " \
+        "Review the budget and savings every month. Income beyond spending goes into savings. "
+
+
+def topic_terms(first, second, per_topic=10):
+    return [np.array(first) for _ in range(per_topic)] + [np.array(second) for _ in range(per_topic)]
+
+
+@pytest.fixture(scope="module")
+def nlp():
+    pipeline = spacy.blank("en")
+    pipeline.add_pipe("sentencizer")
+    return pipeline
+
+
+def test_boundary_falls_at_the_topic_change():
+    tiling = TextTilingSegmenter(window=3)
+    terms = topic_terms([1, 2, 3, 4], [50, 51, 52, 53])
+    assert tiling.boundaries(terms) == [10]
+    assert TextTilingSegmenter(window=3, threshold=10.0).boundaries(terms) == []
+
+
+def test_segments_are_deterministic_and_cover_every_sentence(nlp):
+    tiling = TextTilingSegmenter(window=2, block_sentences=4)
+    sentences = list(nlp(GARDEN * 2 + MONEY * 2 + GARDEN * 2).sents)
+
+    runs = [[[sent.text for sent in segment] for segment in tiling.segment(sentences)] for _ in range(3)]
+    assert runs[0] == runs[1] == runs[2]
+    assert [text for segment in runs[0] for text in segment] == [sent.text for sent in sentences]
+    assert len(runs[0]) >= 3
+
+
+def test_concurrent_segmentation_matches_sequential(nlp):
+    tiling = TextTilingSegmenter(window=2, block_sentences=4)
+    docs = [nlp(GARDEN * 3 + MONEY * 3), nlp(MONEY * 2 + GARDEN * 4), nlp(GARDEN + MONEY + GARDEN + MONEY)]
+
+    def run(doc):
+        return [[sent.start for sent in segment] for segment in tiling.segment(doc.sents)]
+
+    expected = [run(doc) for doc in docs]
+    mismatches = []
+
+    def worker(idx):
+        for _ in range(20):
+            if run(docs[idx]) != expected[idx]:
+                mismatches.append(idx)
+
+    # Switch threads as often as possible so shared per-call state would be caught
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    try:
+        threads = [threading.Thread(target=worker, args=(idx % len(docs),)) for idx in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(30)
+    finally:
+        sys.setswitchinterval(interval)
+    assert mismatches == []
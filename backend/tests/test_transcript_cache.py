@@ -0,0 +1,101 @@
+import os
+import threading
+import time
+
+import cache
+from transcript_cache import TranscriptCache
+
+CUES = [{"text": "hello", "start": 0.0, "duration": 1.0}]
+
+
+class CountingFetch:
+    def __init__(self, result=CUES):
+        self.result = result
+        self.calls = []
+
+    def __call__(self, video_id):
+        self.calls.append(video_id)
+        return self.result
+
+
+def test_second_get_is_a_memory_hit(tmp_path):
+    fetch = CountingFetch()
+    transcripts = TranscriptCache(fetch=fetch, cache_dir=str(tmp_path))
+
+    assert transcripts.get("abc") == CUES
+    assert transcripts.get("abc") == CUES
+    assert fetch.calls == ["abc"]
+    assert transcripts.stats["memory_hits"] == 1
+    assert transcripts.stats["misses"] == 1
+
+
+def test_disk_tier_survives_a_new_cache(tmp_path):
+    TranscriptCache(fetch=CountingFetch(), cache_dir=str(tmp_path)).get("abc")
+
+    fetch = CountingFetch()
+    fresh = TranscriptCache(fetch=fetch, cache_dir=str(tmp_path))
+    assert fresh.get("abc") == CUES
+    assert fresh.get("abc") == CUES
+    assert fetch.calls == []
+    assert fresh.stats["disk_hits"] == 1
+    assert fresh.stats["memory_hits"] == 1
+
+
+def test_failed_fetches_are_not_cached(tmp_path):
+    fetch = CountingFetch(result=None)
+    transcripts = TranscriptCache(fetch=fetch, cache_dir=str(tmp_path))
+
+    assert transcripts.get("abc") is None
+    assert transcripts.get("abc") is None
+    assert fetch.calls == ["abc", "abc"]
+
+
+def test_expired_entries_are_fetched_again(tmp_path, monkeypatch):
+    fetch = CountingFetch()
+    transcripts = TranscriptCache(fetch=fetch, cache_dir=str(tmp_path), ttl=60)
+    transcripts.get("abc")
+
+    # Age both tiers past the TTL
+    now = time.time()
+    for name in os.listdir(tmp_path):
+        os.utime(tmp_path / name, (now - 120, now - 120))
+    monkeypatch.setattr(cache.time, "time", lambda: now + 120)
+
+    transcripts.get("abc")
+    assert fetch.calls == ["abc", "abc"]
+
+
+def test_memory_only_cache_evicts_least_recently_used():
+    fetch = CountingFetch()
+    transcripts = TranscriptCache(fetch=fetch, cache_dir=None, max_memory_entries=2)
+    for video_id in ("a", "b", "a", "c", "a", "b"):
+        transcripts.get(video_id)
+    assert fetch.calls == ["a", "b", "c", "b"]
+
+
+def test_concurrent_misses_share_one_fetch(tmp_path):
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow_fetch(video_id):
+        calls.append(video_id)
+        started.set()
+        release.wait(5)
+        return CUES
+
+    transcripts = TranscriptCache(fetch=slow_fetch, cache_dir=str(tmp_path))
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(transcripts.get("abc"))) for _ in range(5)]
+    threads[0].start()
+    started.wait(5)
+    for thread in threads[1:]:
+        thread.start()
+    while transcripts.stats["coalesced"] < 4:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join(5)
+
+    assert calls == ["abc"]
+    assert results == [CUES] * 5
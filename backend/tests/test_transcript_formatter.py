@@ -0,0 +1,56 @@
+import re
+
+from transcript_formatter import TranscriptBlock, coarse_starts, compact_transcript, render_blocks
+
+CUES = [
+    {"text": "[Music]", "start": 0.0},
+    {"text": "Welcome back. Today we", "start": 1.2},
+    {"text": "talk about habits.", "start": 3.9},
+    {"text": "Write your goals down [Applause] every", "start": 7.25},
+    {"text": "single morning.", "start": 9.6},
+    {"text": "Then review them weekly.", "start": 12.8}
+]
+
+
+def written_starts(text):
+    return re.findall(r"^\[([^\]]+)\]", text, re.MULTILINE)
+
+
+def test_blocks_merge_cues_and_drop_non_speech():
+    compact = compact_transcript(CUES, max_block_chars=30)
+
+    assert [block.text for block in compact.blocks] == [
+        "Welcome back. Today we talk about habits.",
+        "Write your goals down every single morning.",
+        "Then review them weekly."
+    ]
+    assert written_starts(compact.text) == ["1", "7", "12"]
+    assert compact.stats()["saved_tokens"] == compact.original_tokens - compact.compact_tokens > 0
+
+
+def test_written_timestamps_resolve_to_the_original_block_start():
+    compact = compact_transcript(CUES, max_block_chars=30)
+    for written, block in zip(written_starts(compact.text), compact.blocks):
+        assert compact.resolve_timestamp(written) == str(block.start)
+
+    # A time inside a block resolves to that block; unreadable values pass through
+    assert compact.resolve_timestamp("10") == "7.25"
+    assert compact.resolve_timestamp("not a time") == "not a time"
+    assert compact.resolve_timestamp(None) == ""
+
+
+def test_blocks_in_the_same_second_stay_distinct():
+    blocks = [TranscriptBlock(5.1, "Short."), TranscriptBlock(5.7, "Also short."),
+              TranscriptBlock(5.73, "Tiny."), TranscriptBlock(6.2, "Next.")]
+    compact = compact_transcript([{"text": block.text, "start": block.start} for block in blocks],
+                                 max_block_chars=3)
+
+    assert coarse_starts(compact.blocks) == [5, 5.7, 5.73, 6]
+    assert written_starts(render_blocks(compact.blocks)) == ["5", "5.7", "5.73", "6"]
+    for written, block in zip(written_starts(compact.text), compact.blocks):
+        assert compact.resolve_timestamp(written) == str(block.start)
+
+    parsed = {"action_steps": [{"action": "a", "timestamp": "5"}], "examples": [{"example": "b", "timestamp": "5.7"}]}
+    resolved = compact.resolve_timestamps(parsed)
+    assert resolved["action_steps"][0]["timestamp"] == "5.1"
+    assert resolved["examples"][0]["timestamp"] == "5.7"
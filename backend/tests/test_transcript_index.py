@@ -0,0 +1,54 @@
+from transcript_index import TranscriptIndex
+
+TRANSCRIPT = [
+    {"text": "Welcome back to the channel everyone", "start": 0.0},
+    {"text": "today we talk about morning routines", "start": 4.2},
+    {"text": "the first habit is drinking a glass of water", "start": 9.8},
+    {"text": "right after you wake up in the morning", "start": 13.1},
+    {"text": "the second habit is writing three priorities", "start": 18.5},
+    {"text": "in a notebook before opening your email", "start": 22.0},
+    {"text": "a client of mine doubled her output", "start": 27.4},
+    {"text": "just by protecting her first hour", "start": 31.9}
+]
+
+
+def test_paraphrased_items_resolve_to_their_cue():
+    index = TranscriptIndex(TRANSCRIPT)
+    assert index.resolve("Drink a glass of water when you wake up") == "9.8"
+    assert index.resolve("Write three priorities in a notebook before email") == "18.5"
+    assert index.resolve("A client doubled output by protecting the first hour") == "27.4"
+
+
+def test_item_spanning_cues_resolves_to_where_it_starts():
+    index = TranscriptIndex(TRANSCRIPT)
+    assert index.resolve("Write your priorities in a notebook before opening email") == "18.5"
+
+
+def test_shingles_in_too_many_cues_are_ignored():
+    index = TranscriptIndex(TRANSCRIPT, max_postings=1)
+    # "habit" occurs in two cues, so only the rarer words can place the item
+    assert index.locate("habit") is None
+    cue, _ = index.locate("habit priorities")
+    assert TRANSCRIPT[cue]["start"] == 18.5
+
+
+def test_unmatched_text_falls_back_to_the_cue_at_the_model_timestamp():
+    index = TranscriptIndex(TRANSCRIPT)
+    assert index.locate("quantum chromodynamics") is None
+    assert index.resolve("quantum chromodynamics", "20") == "18.5"
+    assert index.resolve("quantum chromodynamics", "not a time") == "not a time"
+    assert index.resolve("quantum chromodynamics") == ""
+    assert index.cue_at(-1) is None
+
+
+def test_resolve_timestamps_fills_every_section():
+    parsed = {
+        "action_steps": [{"action": "Drink water", "explanation": "right after you wake up", "timestamp": "0"}],
+        "key_insights": [{"keyInsight": "Protecting your first hour doubles output"}],
+        "examples": [{"example": "unrelated words", "timestamp": "5"}, "not an item"]
+    }
+    resolved = TranscriptIndex(TRANSCRIPT).resolve_timestamps(parsed)
+
+    assert resolved["action_steps"][0]["timestamp"] == "9.8"
+    assert resolved["key_insights"][0]["timestamp"] == "27.4"
+    assert resolved["examples"][0]["timestamp"] == "4.2"
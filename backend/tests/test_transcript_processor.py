@@ -0,0 +1,66 @@
+import math
+
+from chunking import estimate_tokens
+from fakes import FakeGenerativeModel, synthetic_transcript
+from metrics import metrics
+from transcript_processor import PersonalDevelopmentProcessor
+
+LONG_TRANSCRIPT = synthetic_transcript(60)
+
+
+def processor(model=None, **options):
+    model = model or FakeGenerativeModel(base_latency=0, per_1k_tokens=0)
+    return PersonalDevelopmentProcessor(api_key="offline", model=model, **options)
+
+
+def test_windows_are_sized_in_compact_tokens():
+    proc = processor(chunk_tokens=2000)
+    whole = processor(chunk_tokens=None)._prepare_windows(LONG_TRANSCRIPT)
+    windows = proc._prepare_windows(LONG_TRANSCRIPT)
+
+    assert len(whole) == 1
+    assert all(estimate_tokens(text) <= 2000 for text, _ in windows)
+    # Close to the fewest windows the compact text allows, not the count raw cue lines would need
+    assert len(windows) <= math.ceil(estimate_tokens(whole[0][0]) / (2000 - proc.chunk_overlap_tokens)) + 1
+
+
+def test_chunked_analysis_resolves_timestamps_to_cue_starts():
+    model = FakeGenerativeModel(base_latency=0, per_1k_tokens=0)
+    result = processor(model, chunk_tokens=2000, concurrent=False).process_transcript(LONG_TRANSCRIPT)
+    windows = len(processor(chunk_tokens=2000)._prepare_windows(LONG_TRANSCRIPT))
+
+    assert result["status"] == "success"
+    # One summary and one extraction call per window, plus the summary reduce
+    assert model.calls == 2 * windows + 1
+    starts = {str(float(item["start"])) for item in LONG_TRANSCRIPT}
+    for section in ("action_steps", "key_insights", "examples"):
+        assert result["data"][section]
+        assert all(item["timestamp"] in starts for item in result["data"][section])
+
+
+def test_prefilter_budget_larger_than_a_chunk_still_applies():
+    unfiltered = processor(chunk_tokens=2000)._prepare_windows(LONG_TRANSCRIPT)
+    windows = processor(chunk_tokens=2000, prefilter_tokens=5000)._prepare_windows(LONG_TRANSCRIPT)
+
+    assert 1 < len(windows) < len(unfiltered)
+    blocks = {(block.start, block.text) for _, compact in windows for block in compact.blocks}
+    assert estimate_tokens("\n".join(text for _, text in blocks)) <= 5000
+
+    model = FakeGenerativeModel(base_latency=0, per_1k_tokens=0)
+    unfiltered_model = FakeGenerativeModel(base_latency=0, per_1k_tokens=0)
+    processor(model, chunk_tokens=2000, prefilter_tokens=5000).process_transcript(LONG_TRANSCRIPT)
+    processor(unfiltered_model, chunk_tokens=2000).process_transcript(LONG_TRANSCRIPT)
+    assert model.calls < unfiltered_model.calls
+    assert model.prompt_chars < unfiltered_model.prompt_chars * 0.75
+
+
+def test_prefix_tokens_are_counted_per_prompt():
+    def prefix_tokens(name):
+        return metrics._counters.get("prompt_prefix_tokens_total", {}).get((("prefix", name),), 0)
+
+    proc = processor(concurrent=False)
+    before = {name: prefix_tokens(name) for name in ("summary", "analysis")}
+    proc.process_transcript(LONG_TRANSCRIPT[:50])
+
+    assert prefix_tokens("summary") - before["summary"] == proc._summary_prefix().tokens
+    assert prefix_tokens("analysis") - before["analysis"] == proc._action_prefix().tokens
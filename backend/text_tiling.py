@@ -0,0 +1,153 @@
+from typing import Iterable, Iterator, List, Optional, Tuple, TYPE_CHECKING
+
+import numpy as np
+
+if TYPE_CHECKING:
+    from spacy.tokens import Doc, Span
+
+
+class TextTilingSegmenter:
+    """TextTiling-style topic segmentation over spaCy sentences.
+
+    Each sentence becomes a lemma term-frequency vector, built from spaCy's token
+    attribute arrays rather than per-token Python objects. For every gap between two
+    sentences, the summed vectors of the window sentences before and after it are
+    compared by cosine similarity, all gaps at once. A gap's depth score is how far its
+    similarity sits below the highest similarity within window gaps on either side, and
+    gaps whose depth is a local maximum above the threshold become segment boundaries.
+
+    threshold=None uses the usual TextTiling cutoff of mean - std / 2 of the depth
+    scores. Sentences are processed in blocks of block_sentences, so memory stays
+    bounded on arbitrarily long input and segments are yielded as blocks complete.
+    Segmenting costs about the same as the noun-overlap rule, and the lemmatizer adds to
+    parsing, so that rule stays the default; benchmarks.py times both pipelines. The
+    gain is in where the boundaries fall, not in speed.
+    """
+
+    # Tells EnhancedContentProcessor to parse with the lemmatizer enabled
+    needs_lemmas = True
+
+    def __init__(
+        self,
+        window: int = 4,
+        threshold: Optional[float] = None,
+        min_segment_sentences: int = 2,
+        block_sentences: int = 1000
+    ):
+        self.window = window
+        self.threshold = threshold
+        self.min_segment_sentences = min_segment_sentences
+        self.block_sentences = block_sentences
+
+    @staticmethod
+    def doc_terms(doc: "Doc") -> Tuple[np.ndarray, np.ndarray]:
+        """Term id of every token in a Doc, its lemma hash or the lowercased text when the
+        pipeline has no lemmatizer, and a mask of the tokens that are content words."""
+        from spacy.attrs import IS_ALPHA, IS_STOP, LEMMA, LOWER
+
+        attrs = doc.to_array([LEMMA, LOWER, IS_ALPHA, IS_STOP])
+        return np.where(attrs[:, 0] != 0, attrs[:, 0], attrs[:, 1]), (attrs[:, 2] == 1) & (attrs[:, 3] == 0)
+
+    def _term_matrix(self, term_lists: List[np.ndarray]) -> np.ndarray:
+        lengths = np.fromiter((len(terms) for terms in term_lists), dtype=np.int64, count=len(term_lists))
+        if not lengths.sum():
+            return np.zeros((len(term_lists), 1), dtype=np.float32)
+        vocabulary, cols = np.unique(np.concatenate(term_lists), return_inverse=True)
+        rows = np.repeat(np.arange(len(term_lists)), lengths)
+        counts = np.bincount(rows * len(vocabulary) + cols, minlength=len(term_lists) * len(vocabulary))
+        return counts.reshape(len(term_lists), len(vocabulary)).astype(np.float32)
+
+    def gap_similarities(self, term_lists: List[np.ndarray]) -> np.ndarray:
+        """Cosine similarity across each gap; entry i is the gap before sentence i + 1."""
+        count = len(term_lists)
+        if count < 2:
+            return np.zeros(0, dtype=np.float32)
+        matrix = self._term_matrix(term_lists)
+        cumulative = np.vstack([np.zeros((1, matrix.shape[1]), dtype=np.float32), np.cumsum(matrix, axis=0)])
+
+        gaps = np.arange(1, count)
+        left = cumulative[gaps] - cumulative[np.maximum(gaps - self.window, 0)]
+        right = cumulative[np.minimum(gaps + self.window, count)] - cumulative[gaps]
+        norms = np.linalg.norm(left, axis=1) * np.linalg.norm(right, axis=1)
+        dots = np.einsum("ij,ij->i", left, right)
+        return np.divide(dots, norms, out=np.zeros_like(dots), where=norms > 0)
+
+    def depth_scores(self, similarities: np.ndarray) -> np.ndarray:
+        """How deep each gap sits in a similarity valley, using the highest point within window gaps on each side."""
+        if not len(similarities):
+            return similarities
+        padded = np.pad(similarities, self.window, constant_values=-np.inf)
+        windows = np.lib.stride_tricks.sliding_window_view(padded, self.window + 1)
+        left_peaks = windows[:len(similarities)].max(axis=1)
+        right_peaks = windows[self.window:].max(axis=1)
+        return left_peaks + right_peaks - 2 * similarities
+
+    def boundaries(self, term_lists: List[np.ndarray]) -> List[int]:
+        """Indexes of the sentences that start a new segment."""
+        depths = self.depth_scores(self.gap_similarities(term_lists))
+        if not len(depths):
+            return []
+        cutoff = depths.mean() - depths.std() / 2 if self.threshold is None else self.threshold
+
+        padded = np.pad(depths, self.window, constant_values=-np.inf)
+        local_max = np.lib.stride_tricks.sliding_window_view(padded, 2 * self.window + 1).max(axis=1)
+        candidates = np.flatnonzero((depths > cutoff) & (depths > 0) & (depths >= local_max)) + 1
+
+        # Candidates are few, so spacing them out is cheap in Python
+        selected = []
+        previous = 0
+        for start in candidates.tolist():
+            if start - previous >= self.min_segment_sentences and len(term_lists) - start >= self.min_segment_sentences:
+                selected.append(start)
+                previous = start
+        return selected
+
+    def _cuts_after(self, term_lists: List[np.ndarray], emitted: int, limit: int) -> List[int]:
+        cuts = []
+        previous = emitted
+        for cut in self.boundaries(term_lists):
+            if cut - previous >= self.min_segment_sentences and cut <= limit:
+                cuts.append(cut)
+                previous = cut
+        return cuts
+
+    def segment(self, sentences: Iterable["Span"]) -> Iterator[List["Span"]]:
+        """Group sentences into topic segments, yielding each segment once its boundary is settled."""
+        buffered: List["Span"] = []
+        term_lists: List[np.ndarray] = []
+        # buffered[:emitted] were already yielded and only stay as left context
+        emitted = 0
+        # A boundary's depth depends on sentences up to 2 * window away
+        reach = 2 * self.window
+
+        # Token attributes are fetched once per Doc; kept local so concurrent calls share nothing
+        doc = doc_terms = None
+
+        for sent in sentences:
+            if sent.doc is not doc:
+                doc, doc_terms = sent.doc, self.doc_terms(sent.doc)
+            ids, content = doc_terms
+            buffered.append(sent)
+            term_lists.append(ids[sent.start:sent.end][content[sent.start:sent.end]])
+            if len(buffered) - emitted < self.block_sentences + reach:
+                continue
+
+            settled = len(buffered) - reach
+            cuts = self._cuts_after(term_lists, emitted, settled)
+            if not cuts:
+                # Never let one segment grow without bound
+                cuts = [settled]
+            for cut in cuts:
+                yield buffered[emitted:cut]
+                emitted = cut
+
+            keep_from = max(0, emitted - reach)
+            buffered = buffered[keep_from:]
+            term_lists = term_lists[keep_from:]
+            emitted -= keep_from
+
+        for cut in self._cuts_after(term_lists, emitted, len(buffered)):
+            yield buffered[emitted:cut]
+            emitted = cut
+        if len(buffered) > emitted:
+            yield buffered[emitted:]
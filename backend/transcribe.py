@@ -6,14 +6,13 @@ import logging
 # import whisper
 # from pydub import AudioSegment
 import os
-from transformers import BartForConditionalGeneration, BartTokenizer
+from typing import List, Dict, Any, Optional, Callable
 from youtube_transcript_api import YouTubeTranscriptApi
+from metrics import metrics
 import json
 
 
-# Configure logging
-logging.basicConfig(level=logging.INFO, format='%(message)s')
-logger = logging.getLogger()
+logger = logging.getLogger(__name__)
 
 # from pytube import YouTube
 # from pytubefix.exceptions import VideoUnavailable
@@ -70,29 +69,47 @@ logger = logging.getLogger()
 #         logger.error(f"Error in transcription: {e}")
 #         raise
 
-from youtube_transcript_api import YouTubeTranscriptApi
-
-import json
+# Caption cues that carry no speech and only waste prompt space downstream
+NON_SPEECH_CUES = {'[Music]', '[Applause]', '[Laughter]', '[Inaudible]', '[Silence]', '[Noise]'}
 
-def get_transcript(video_id):
+def get_transcript(video_id: str) -> Optional[List[Dict[str, Any]]]:
+    """Fetches the structured transcript (list of cues) for a YouTube video."""
     try:
         # Fetch transcript using YouTubeTranscriptApi
-        transcript = YouTubeTranscriptApi.get_transcript(video_id)
-        
-        # Save combined text to a file
-        combined_text = ' '.join(part['text'] for part in transcript)
-        with open("transcript.txt", "w") as file:
-            file.write(combined_text)
-
-        # Return structured transcript as JSON
-        return json.dumps(transcript)  # Ensure valid JSON output
+        with metrics.timed("transcript_fetch"):
+            return YouTubeTranscriptApi.get_transcript(video_id)
     except Exception as e:
-        print(f"An error occurred: {e}")
+        metrics.inc("transcript_fetch_failures_total")
+        logger.error(f"An error occurred: {e}")
         return None
 
+def combine_transcript(transcript: List[Dict[str, Any]]) -> str:
+    """Joins the cue texts into a single block of text."""
+    return ' '.join(part['text'] for part in transcript).strip()
+
+def load_transcript(
+    video_id: str,
+    fetch: Callable[[str], Optional[List[Dict[str, Any]]]] = get_transcript
+) -> Optional[Dict[str, Any]]:
+    """Fetches a transcript in-process and returns both the cues and the combined text.
+    Pass a cache's get method as fetch to serve repeated videos without refetching."""
+    transcript = fetch(video_id)
+    if transcript is None:
+        return None
+
+    # Filter out non-speech cues such as [Music]
+    structured_transcript = [item for item in transcript if item['text'] not in NON_SPEECH_CUES]
+
+    return {
+        "structured_transcript": structured_transcript,
+        "combined_text": combine_transcript(structured_transcript)
+    }
+
 if __name__ == "__main__":
     import sys
 
+    logging.basicConfig(level=logging.INFO, format='%(message)s')
+
     if len(sys.argv) != 2:
         print(json.dumps({"error": "Usage: python transcribe.py <YouTubeVideoID>"}))
         sys.exit(1)
@@ -100,7 +117,10 @@ if __name__ == "__main__":
     youtube_id = sys.argv[1]
     transcript = get_transcript(youtube_id)
     if transcript:
-        print(transcript)
+        # Save combined text to a file for sections.py
+        with open("transcript.txt", "w") as file:
+            file.write(combine_transcript(transcript))
+        print(json.dumps(transcript))
     else:
         print(json.dumps({"error": "Failed to fetch transcript."}))
 
@@ -0,0 +1,56 @@
+import os
+from typing import Any, Callable, Dict, List, Optional
+
+from cache import DiskCache, MemoryCache, TieredCache, hash_key
+from transcribe import get_transcript
+
+Transcript = List[Dict[str, Any]]
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.cache', 'transcripts')
+
+
+class TranscriptCache:
+    """Two-tier cache in front of transcribe.get_transcript, keyed by YouTube video ID.
+
+    The fetch function is injectable so the cache can be exercised offline with a stub.
+    """
+
+    def __init__(
+        self,
+        fetch: Callable[[str], Optional[Transcript]] = get_transcript,
+        cache_dir: Optional[str] = DEFAULT_CACHE_DIR,
+        max_memory_entries: int = 128,
+        max_disk_entries: int = 5000,
+        ttl: Optional[float] = 7 * 24 * 3600
+    ):
+        self.fetch = fetch
+        disk = DiskCache(cache_dir, max_entries=max_disk_entries, ttl=ttl) if cache_dir else None
+        self._cache = TieredCache(MemoryCache(max_entries=max_memory_entries, ttl=ttl), disk)
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return self._cache.stats
+
+    def hit_rate(self) -> float:
+        return self._cache.hit_rate()
+
+    def get(self, video_id: str) -> Optional[Transcript]:
+        """Returns the cue list for a video, fetching it at most once across concurrent callers."""
+        return self._cache.get_or_compute(hash_key('transcript', video_id), lambda: self.fetch(video_id))
+
+    def invalidate(self, video_id: str) -> None:
+        self._cache.invalidate(hash_key('transcript', video_id))
+
+    def clear(self) -> None:
+        self._cache.clear()
+
+
+def transcript_cache_from_env() -> TranscriptCache:
+    """Builds the transcript cache from TRANSCRIPT_CACHE_* environment variables."""
+    cache_dir = os.getenv('TRANSCRIPT_CACHE_DIR', DEFAULT_CACHE_DIR)
+    return TranscriptCache(
+        cache_dir=cache_dir or None,
+        max_memory_entries=int(os.getenv('TRANSCRIPT_CACHE_MEMORY_ENTRIES', 128)),
+        max_disk_entries=int(os.getenv('TRANSCRIPT_CACHE_DISK_ENTRIES', 5000)),
+        ttl=float(os.getenv('TRANSCRIPT_CACHE_TTL', 7 * 24 * 3600))
+    )
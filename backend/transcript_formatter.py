@@ -0,0 +1,140 @@
+import math
+import re
+from bisect import bisect_right
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from chunking import estimate_tokens, format_cue
+from transcribe import NON_SPEECH_CUES
+
+# The caption markers transcribe drops as whole cues, also found mid-cue and in any case
+NON_SPEECH_PATTERN = re.compile("|".join(re.escape(cue) for cue in sorted(NON_SPEECH_CUES)), re.IGNORECASE)
+SENTENCE_END_PATTERN = re.compile(r"[.!?][\"')\]]*$")
+
+
+@dataclass
+class TranscriptBlock:
+    start: float
+    text: str
+
+
+@dataclass
+class CompactTranscript:
+    blocks: List[TranscriptBlock]
+    text: str
+    original_tokens: int
+    compact_tokens: int
+
+    def __post_init__(self):
+        self._coarse_starts = coarse_starts(self.blocks)
+
+    def stats(self) -> Dict[str, Any]:
+        saved = self.original_tokens - self.compact_tokens
+        return {
+            "original_tokens": self.original_tokens,
+            "compact_tokens": self.compact_tokens,
+            "saved_tokens": saved,
+            "savings_ratio": saved / self.original_tokens if self.original_tokens else 0.0,
+            "blocks": len(self.blocks)
+        }
+
+    def resolve_timestamp(self, timestamp: Any) -> str:
+        """Maps a coarse timestamp written in the prompt back to the original start of its block."""
+        try:
+            value = float(timestamp)
+        except (TypeError, ValueError):
+            return str(timestamp) if timestamp is not None else ""
+        idx = bisect_right(self._coarse_starts, value) - 1
+        if idx < 0:
+            return str(timestamp)
+        return str(self.blocks[idx].start)
+
+    def resolve_timestamps(self, parsed_response: Dict[str, Any]) -> Dict[str, Any]:
+        for key in ("action_steps", "key_insights", "examples"):
+            for item in parsed_response.get(key, []):
+                if isinstance(item, dict) and 'timestamp' in item:
+                    item['timestamp'] = self.resolve_timestamp(item['timestamp'])
+        return parsed_response
+
+
+def _merge_cues(transcript: List[Dict[str, Any]], max_block_chars: int) -> List[TranscriptBlock]:
+    blocks = []
+    current = None
+    for item in transcript:
+        text = NON_SPEECH_PATTERN.sub(" ", str(item['text']))
+        text = re.sub(r"\s+", " ", text).strip()
+        if not text:
+            continue
+        start = float(item['start'])
+        if current is None:
+            current = TranscriptBlock(start=start, text=text)
+        else:
+            current.text = f"{current.text} {text}"
+
+        # Close the block at a sentence end once it has some substance, or when it gets too long
+        if (len(current.text) >= max_block_chars // 3 and SENTENCE_END_PATTERN.search(current.text)) \
+                or len(current.text) >= max_block_chars:
+            blocks.append(current)
+            current = None
+    if current is not None:
+        blocks.append(current)
+    return blocks
+
+
+def coarse_starts(blocks: List[TranscriptBlock]) -> List[float]:
+    """The timestamp written for each block: its whole second, or as many decimals as it takes
+    to stay after the previous block's, so every block can be told apart when resolving."""
+    starts = []
+    previous = float("-inf")
+    for block in blocks:
+        start = float(math.floor(block.start))
+        for digits in range(1, 4):
+            if start > previous:
+                break
+            start = math.floor(block.start * 10 ** digits) / 10 ** digits
+        if start <= previous:
+            start = block.start
+        starts.append(start)
+        previous = start
+    return starts
+
+
+def _format_start(start: float) -> str:
+    return str(int(start)) if start.is_integer() else str(start)
+
+
+def render_blocks(blocks: List[TranscriptBlock], timestamps: bool = True) -> str:
+    if not timestamps:
+        return "\n".join(block.text for block in blocks)
+    return "\n".join(
+        f"[{_format_start(start)}] {block.text}" for start, block in zip(coarse_starts(blocks), blocks)
+    )
+
+
+def blocks_transcript(blocks: List[TranscriptBlock], original_tokens: Optional[int] = None) -> CompactTranscript:
+    """A CompactTranscript over some of another one's blocks, e.g. one window of a long transcript."""
+    text = render_blocks(blocks)
+    tokens = estimate_tokens(text)
+    return CompactTranscript(
+        blocks=blocks,
+        text=text,
+        original_tokens=tokens if original_tokens is None else original_tokens,
+        compact_tokens=tokens
+    )
+
+
+def compact_transcript(transcript: List[Dict[str, Any]], max_block_chars: int = 240) -> CompactTranscript:
+    """Formats the cue list for a prompt with far fewer timestamp tokens.
+
+    Adjacent cues are merged into sentence-sized blocks that carry a whole-second
+    timestamp, and non-speech markers are dropped.
+    """
+    original_tokens = estimate_tokens("\n".join(format_cue(item) for item in transcript))
+    blocks = _merge_cues(transcript, max_block_chars)
+    text = render_blocks(blocks)
+    return CompactTranscript(
+        blocks=blocks,
+        text=text,
+        original_tokens=original_tokens,
+        compact_tokens=estimate_tokens(text)
+    )
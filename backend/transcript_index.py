@@ -0,0 +1,110 @@
+import math
+import re
+from bisect import bisect_right
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+# Words too common to say anything about where an item came from
+STOPWORDS = frozenset(
+    "a an and are as at be but by do for from have i if in is it its me my of on or our so "
+    "that the their them then there they this to up was we what when with you your".split()
+)
+WORD_PATTERN = re.compile(r"[a-z0-9']+")
+
+# Text fields of the extracted items that are matched against the cues
+ITEM_TEXT_KEYS = {
+    "action_steps": ("action", "explanation"),
+    "key_insights": ("keyInsight",),
+    "examples": ("example",)
+}
+
+
+def _words(text: str) -> List[str]:
+    return [word for word in WORD_PATTERN.findall(text.lower()) if word not in STOPWORDS]
+
+
+class TranscriptIndex:
+    """Finds the cue an extracted item came from without asking the model for timestamps.
+
+    Cue start times are kept sorted for bisect lookups, and every content word and
+    word bigram (shingle) of the cue text maps to the cues it occurs in. An item is
+    resolved by looking up its own shingles, weighting each by how rare it is, and
+    picking the cue whose neighborhood collects the most weight; each lookup is a hash
+    probe, so cost depends on the item's length rather than the transcript's.
+    """
+
+    def __init__(self, transcript: List[Dict[str, Any]], span: int = 3, max_postings: int = 50):
+        """span: how many consecutive cues one item may stretch across.
+        max_postings: shingles found in more cues than this are too common to help and are skipped."""
+        self.transcript = transcript
+        self.starts = [float(item['start']) for item in transcript]
+        self.span = span
+        self.max_postings = max_postings
+        self._postings: Dict[Any, List[int]] = defaultdict(list)
+
+        # Shingles may straddle cue boundaries; each belongs to the cue of its first word
+        previous: Optional[str] = None
+        for idx, item in enumerate(transcript):
+            for word in _words(str(item['text'])):
+                self._add(word, idx)
+                if previous is not None:
+                    self._add((previous, word), idx)
+                previous = word
+
+    def _add(self, shingle: Any, idx: int) -> None:
+        postings = self._postings[shingle]
+        if not postings or postings[-1] != idx:
+            postings.append(idx)
+
+    def cue_at(self, seconds: float) -> Optional[int]:
+        """Index of the cue playing at the given time."""
+        idx = bisect_right(self.starts, seconds) - 1
+        return idx if idx >= 0 else None
+
+    def locate(self, text: str) -> Optional[Tuple[int, float]]:
+        """Returns (cue index, score) of the best match for text, or None when nothing matches."""
+        words = _words(text)
+        shingles = words + list(zip(words, words[1:]))
+        count = len(self.transcript)
+        votes: Dict[int, float] = defaultdict(float)
+        for shingle in set(shingles):
+            postings = self._postings.get(shingle)
+            if not postings or len(postings) > self.max_postings:
+                continue
+            weight = math.log(1 + count / len(postings)) * (2.0 if isinstance(shingle, tuple) else 1.0)
+            for idx in postings:
+                votes[idx] += weight
+        if not votes:
+            return None
+
+        # An item usually paraphrases a few neighboring cues, so score each cue with the ones after it
+        best = None
+        for idx in votes:
+            score = sum(votes.get(idx + offset, 0.0) for offset in range(self.span))
+            if best is None or score > best[1] or (score == best[1] and idx < best[0]):
+                best = (idx, score)
+        return best
+
+    def resolve(self, text: str, timestamp: Any = None) -> str:
+        """Start time of the cue that best matches text. Falls back to the cue playing at
+        timestamp, then to timestamp itself, when the text matches nothing."""
+        match = self.locate(text)
+        if match is not None:
+            return str(self.transcript[match[0]]['start'])
+        try:
+            idx = self.cue_at(float(timestamp))
+        except (TypeError, ValueError):
+            idx = None
+        if idx is not None:
+            return str(self.transcript[idx]['start'])
+        return str(timestamp) if timestamp is not None else ""
+
+    def resolve_timestamps(self, parsed_response: Dict[str, Any]) -> Dict[str, Any]:
+        """Fills in the timestamp of every extracted item from its text."""
+        for key, text_keys in ITEM_TEXT_KEYS.items():
+            for item in parsed_response.get(key, []):
+                if not isinstance(item, dict):
+                    continue
+                text = " ".join(str(item.get(text_key, "")) for text_key in text_keys)
+                item['timestamp'] = self.resolve(text, item.get('timestamp'))
+        return parsed_response
@@ -1,11 +1,96 @@
-import google.generativeai as genai
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Callable, Optional, Tuple, Iterator, Union
 from dataclasses import dataclass
+from concurrent.futures import Future, ThreadPoolExecutor
+import importlib
+import threading
+import time
+import logging
 import json
 import re
 import os
 
-from rich import _console
+from analysis_cache import AnalysisCache
+from chunking import chunk_transcript, estimate_tokens, format_cue, merge_analyses
+from transcript_formatter import CompactTranscript, blocks_transcript, compact_transcript, render_blocks
+from transcript_index import TranscriptIndex
+from llm_client import RateLimitedModel
+from prompt_cache import PromptPrefix, PromptTemplateCache
+from response_parser import ParseResult, merge_section_items, parse_analysis
+from prefilter import prefilter_transcript, reduction_stats
+from registry import registry
+from metrics import SIZE_BUCKETS, log_sampled, metrics
+
+logger = logging.getLogger(__name__)
+
+# The Gemini SDK pulls in grpc and friends, so it is only imported when a model is first needed
+registry.register("gemini_sdk", lambda: importlib.import_module("google.generativeai"))
+
+# Bump whenever the summary or action prompts change so cached analyses are not reused
+PROMPT_VERSION = "3"
+
+REDUCTION_BUCKETS = (0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0)
+# Item fields per section of the extraction response, timestamp last
+ITEM_FIELDS = {
+    "action_steps": ("action", "explanation", "timestamp"),
+    "key_insights": ("keyInsight", "timestamp"),
+    "examples": ("example", "timestamp")
+}
+# How much of a broken response is quoted back in a repair prompt
+REPAIR_FRAGMENT_CHARS = 4000
+
+# Static parts of the prompts. They form cacheable prefixes, with the transcript appended last
+SUMMARY_PREFIX = """You are an expert in personal development content analysis. Review this transcript and provide:
+1. The main message and key takeaways
+
+Transcript:
+"""
+SUMMARY_REDUCE_PREFIX = """You are an expert in personal development content analysis. The following are summaries of
+consecutive parts of one video. Combine them into a single summary of:
+1. The main message and key takeaways
+
+Part summaries:
+"""
+ACTION_INSTRUCTIONS = """Analyze the following personal development content and extract the required information in the exact JSON format shown below. Ensure that:
+- Responses adhere strictly to the JSON structure.
+- No additional text, markdown, or explanations are included outside the JSON structure.
+- Each action step is concrete, practical, and immediately implementable."""
+ACTION_SCHEMA = {
+    "action_steps": [{
+        "action": "Specific action to take or not to take",
+        "explanation": "Brief explanation of how to implement this action or why not to take a certain action",
+        "timestamp": "Timestamp in the video using the transcript to locate the action"
+    }],
+    "key_insights": [{
+        "keyInsight": "A significant insight that is not an action but a key point to remember",
+        "timestamp": "Timestamp in the video using the transcript to locate the key insight"
+    }],
+    "examples": [{
+        "example": "An example illustrating a concept or action mentioned in the content",
+        "timestamp": "Timestamp in the video using the transcript to locate the example"
+    }]
+}
+ACTION_EXAMPLE = {
+    "action_steps": [{
+        "action": "Start practicing mindfulness for 5 minutes daily",
+        "explanation": "Helps improve focus and reduce stress. Start by setting aside 5 minutes each morning.",
+        "timestamp": "2548.546"
+    }],
+    "key_insights": [{
+        "keyInsight": "Mindfulness can rewire your brain for better focus and emotional regulation",
+        "timestamp": "1548.687"
+    }],
+    "examples": [{
+        "example": "Try a simple breathing exercise, inhaling for 4 seconds and exhaling for 4 seconds",
+        "timestamp": "436.7576"
+    }]
+}
+
+
+def _without_timestamps(response: Dict[str, List[Dict[str, str]]]) -> Dict[str, List[Dict[str, str]]]:
+    return {
+        section: [{key: value for key, value in item.items() if key != "timestamp"} for item in items]
+        for section, items in response.items()
+    }
 
 @dataclass
 class ActionItem:
@@ -58,10 +143,86 @@ class ProcessedContent:
         }
 
 class PersonalDevelopmentProcessor:
-    def __init__(self, api_key: str):
-        genai.configure(api_key=api_key)
-        self.model = genai.GenerativeModel('gemini-pro')
+    def __init__(
+        self,
+        api_key: str,
+        model_name: str = 'gemini-pro',
+        result_cache: Optional[AnalysisCache] = None,
+        concurrent: bool = True,
+        max_workers: int = 4,
+        model: Optional[Any] = None,
+        chunk_tokens: Optional[int] = 8000,
+        chunk_overlap_tokens: int = 200,
+        compact_format: bool = True,
+        prefilter_tokens: Optional[int] = None,
+        local_timestamps: bool = False,
+        repair_responses: bool = True,
+        client_options: Optional[Dict[str, Any]] = None
+    ):
+        """model: replaces the Gemini client, e.g. with a local fake.
+        concurrent: runs the summary and extraction calls on a pool of max_workers threads.
+        chunk_tokens: longer transcripts are analyzed in overlapping windows; None sends them whole.
+        compact_format: merges caption cues into sentence-sized blocks with coarse timestamps.
+        prefilter_tokens: cuts longer compact transcripts down to their highest-scoring blocks.
+        local_timestamps: leaves timestamps out of the prompt and resolves items to cues locally.
+        repair_responses: re-requests only the sections a broken extraction response lost.
+        client_options: routes every call through a RateLimitedModel with these settings."""
+        self.api_key = api_key
+        self.model_name = model_name
+        self.client_options = client_options
+        self.prompt_templates = PromptTemplateCache()
+        self._model = self._wrap_model(model) if model is not None else None
+        self._model_lock = threading.Lock()
+        self.result_cache = result_cache
+        self.concurrent = concurrent
+        self.chunk_tokens = chunk_tokens
+        self.chunk_overlap_tokens = chunk_overlap_tokens
+        self.compact_format = compact_format
+        self.prefilter_tokens = prefilter_tokens if compact_format else None
+        self.local_timestamps = local_timestamps
+        self.repair_responses = repair_responses
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='llm')
+        self._pending_calls = 0
+        self._pending_lock = threading.Lock()
     
+    @property
+    def model(self):
+        """The Gemini client, created on first use."""
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    genai = registry.get("gemini_sdk")
+                    genai.configure(api_key=self.api_key)
+                    self._model = self._wrap_model(genai.GenerativeModel(self.model_name))
+        return self._model
+
+    def _wrap_model(self, model: Any) -> Any:
+        if self.client_options is None:
+            return model
+        return RateLimitedModel(model, **self.client_options)
+
+    def pending_llm_calls(self) -> int:
+        """Prompts waiting for a free slot in the LLM thread pool."""
+        return self._pending_calls
+
+    def _submit(self, fn: Callable[..., Any], *args: Any) -> Future:
+        """Runs fn on the LLM thread pool, counting it as pending until a thread picks it up."""
+        with self._pending_lock:
+            self._pending_calls += 1
+
+        def started() -> None:
+            with self._pending_lock:
+                self._pending_calls -= 1
+
+        def run() -> Any:
+            started()
+            return fn(*args)
+
+        future = self._executor.submit(run)
+        # A call cancelled before it started never reaches run()
+        future.add_done_callback(lambda done: started() if done.cancelled() else None)
+        return future
+
     def _format_transcript(self, transcript: List[Dict[str, Any]]) -> str:
         """Formats the transcript list into a readable text format."""
         formatted_text = "\n".join(
@@ -69,155 +230,452 @@ class PersonalDevelopmentProcessor:
         )
         return formatted_text
 
+    def _prepare_windows(
+        self, transcript: List[Dict[str, Any]]
+    ) -> List[Tuple[str, Optional[Union[CompactTranscript, TranscriptIndex]]]]:
+        """Formats the transcript for prompting as (text, mapping) pairs: a single pair when it
+        fits in chunk_tokens, otherwise one per overlapping window. Windows are cut from the same
+        compacted and pre-filtered lines that would be sent whole, and sized by their formatted
+        token counts. A mapping, when set, maps the model's items back to original cue start
+        times through its resolve_timestamps method."""
+        with metrics.timed("format"):
+            index = TranscriptIndex(transcript) if self.local_timestamps else None
+            if not self.compact_format:
+                if index is not None:
+                    return [("\n".join(str(item['text']) for item in window), index)
+                            for window in self._split(transcript, lambda item: str(item['text']))]
+                return [(self._format_transcript(window), None) for window in self._split(transcript, format_cue)]
+
+            # Blocks stay sentence-sized so timestamps keep their precision
+            compact = compact_transcript(transcript)
+            stats = compact.stats()
+            metrics.inc("transcript_tokens_saved_total", stats["saved_tokens"], stage="compact")
+            logger.debug("Compact format: %d cues in %d blocks, %d of %d tokens (%.0f%% saved)", len(transcript),
+                         stats["blocks"], stats["compact_tokens"], stats["original_tokens"], stats["savings_ratio"] * 100)
+            if self.prefilter_tokens:
+                compact = self._prefilter(compact)
+            if index is not None:
+                return [(render_blocks(window, timestamps=False), index)
+                        for window in self._split(compact.blocks, lambda block: block.text)]
+            windows = self._split(compact.blocks, lambda block: render_blocks([block]))
+            if len(windows) == 1:
+                return [(compact.text, compact)]
+            return [(window.text, window) for window in map(blocks_transcript, windows)]
+
+    def _split(self, lines: List[Any], format_line: Callable[[Any], str]) -> List[List[Any]]:
+        """Splits prompt lines into windows of at most chunk_tokens, or keeps them whole when they fit."""
+        if not self.chunk_tokens or estimate_tokens("\n".join(map(format_line, lines))) <= self.chunk_tokens:
+            return [lines]
+        return chunk_transcript(lines, self.chunk_tokens, self.chunk_overlap_tokens, format_line)
+
+    def _prefilter(self, compact: CompactTranscript) -> CompactTranscript:
+        reduced = prefilter_transcript(compact, self.prefilter_tokens)
+        if reduced is not compact:
+            stats = reduction_stats(compact, reduced)
+            metrics.observe("prefilter_reduction_ratio", stats["reduction_ratio"], REDUCTION_BUCKETS)
+            metrics.inc("transcript_tokens_saved_total", stats["tokens_before"] - stats["tokens_after"], stage="prefilter")
+            logger.debug("Pre-filter kept %d of %d blocks, %d of %d tokens (%.0f%% reduction)",
+                         stats["blocks_after"], stats["blocks_before"], stats["tokens_after"],
+                         stats["tokens_before"], stats["reduction_ratio"] * 100)
+        return reduced
+
+    def _summary_prefix(self) -> PromptPrefix:
+        return self.prompt_templates.get("summary", lambda: SUMMARY_PREFIX)
+
+    @staticmethod
+    def _prefixed(prefix: PromptPrefix, text: str) -> str:
+        """Builds a prompt on a static prefix. The prefix tokens are counted separately so /metrics
+        shows how much of each stage's prompt tokens is the reusable part."""
+        metrics.inc("prompt_prefix_tokens_total", prefix.tokens, prefix=prefix.name)
+        return prefix.text + text
+
     def _create_summary_prompt(self, transcript: str) -> str:
-        return f"""
-        You are an expert in personal development content analysis. Review this transcript and provide:
-        1. The main message and key takeaways
-                
-        Transcript:
-        {transcript}
-        """
-        
+        return self._prefixed(self._summary_prefix(), transcript)
+
+    def _create_summary_reduce_prompt(self, summaries: List[str]) -> str:
+        joined = "\n\n".join(f"Part {idx}:\n{summary}" for idx, summary in enumerate(summaries, 1))
+        return self._prefixed(self.prompt_templates.get("summary_reduce", lambda: SUMMARY_REDUCE_PREFIX), joined)
+
+    def _render_action_prefix(self) -> str:
+        schema, example = ACTION_SCHEMA, ACTION_EXAMPLE
+        if self.local_timestamps:
+            # Timestamps are looked up locally from the item text, so the model is not asked for them
+            schema, example = _without_timestamps(schema), _without_timestamps(example)
+        return (
+            f"{ACTION_INSTRUCTIONS}\n\n"
+            f"Required JSON format:\n{json.dumps(schema)}\n\n"
+            f"Example response:\n{json.dumps(example)}\n\n"
+            "Now, analyze this transcript and provide your response in the required JSON format:\n"
+        )
+
+    def _action_prefix(self) -> PromptPrefix:
+        return self.prompt_templates.get("analysis", self._render_action_prefix)
 
     def _create_action_prompt(self, transcript: str) -> str:
+        return self._prefixed(self._action_prefix(), transcript)
+
+    def _create_repair_prompt(self, result: ParseResult, response: str, transcript: str) -> str:
+        """A short follow-up asking only for the sections that failed. It quotes the broken part
+        of the previous answer, and only falls back to the transcript when a section is missing."""
+        fields = []
+        for section in result.failed_sections:
+            names = ITEM_FIELDS[section] if not self.local_timestamps else ITEM_FIELDS[section][:-1]
+            item = ", ".join(f'"{name}": "..."' for name in names)
+            fields.append(f'"{section}": [{{{item}}}]')
+        offsets = [result.section_offsets.get(section) for section in result.failed_sections]
+        if all(offset is not None for offset in offsets):
+            source = "Your previous answer was cut off or malformed. This is the part to fix:\n" \
+                     f"    {response[min(offsets):][:REPAIR_FRAGMENT_CHARS]}"
+        else:
+            source = f"Analyze this transcript:\n    {transcript}"
         return f"""
-    Analyze the following personal development content and extract the required information in the exact JSON format shown below. Ensure that:
-    - Responses adhere strictly to the JSON structure.
-    - No additional text, markdown, or explanations are included outside the JSON structure.
-    - Each action step is concrete, practical, and immediately implementable.
-
-    Required JSON format:
-    {{
-        "action_steps": [
-            {{
-                "action": "Specific action to take or not to take",
-                "explanation": "Brief explanation of how to implement this action or why not to take a certain action",
-                "timestamp": "Timestamp in the video using the transcript to locate the action"
-            }}
-        ],
-        "key_insights": [
-            {{
-                "keyInsight": "A significant insight that is not an action but a key point to remember",
-                "timestamp": "Timestamp in the video using the transcript to locate the key insight"
-            }}
-        ],
-        "examples": [
-            {{
-                "example": "An example illustrating a concept or action mentioned in the content",
-                "timestamp": "Timestamp in the video using the transcript to locate the example"
-            }}
-        ]
-    }}
-
-    Example response:
-    {{
-        "action_steps": [
-            {{
-                "action": "Start practicing mindfulness for 5 minutes daily",
-                "explanation": "Helps improve focus and reduce stress. Start by setting aside 5 minutes each morning.",
-                "timestamp": "2548.546"
-            }}
-        ],
-        "key_insights": [
-            {{
-                "keyInsight": "Mindfulness can rewire your brain for better focus and emotional regulation",
-                "timestamp": "1548.687"
-            }}
-        ],
-        "examples": [
-            {{
-                "example": "Try a simple breathing exercise, inhaling for 4 seconds and exhaling for 4 seconds",
-                "timestamp": "436.7576"
-            }}
-        ]
-    }}
+    Return only valid JSON with exactly these keys and item fields, and no text outside the JSON:
+    {{{", ".join(fields)}}}
 
-    Now, analyze this transcript and provide your response in the required JSON format:
-    {transcript}
+    {source}
     """
 
-    def _extract_json_from_response(self, text: str) -> dict:
-        """Extract JSON from the response text, handling potential formatting issues."""
+    def _parse_analysis(self, response: str, transcript: str) -> Tuple[Dict[str, Any], List[str]]:
+        """Parses the extraction response, keeping every complete item of broken output and
+        re-requesting only the failed sections. Returns (parsed response, sections still failed)."""
+        with metrics.timed("json_extract"):
+            result = parse_analysis(response)
+        if result.complete:
+            return result.data, []
+
+        metrics.inc("json_salvaged_items_total", result.item_count)
+        log_sampled(logger, "Incomplete analysis response", lambda: response, rate=1.0)
+        if not self.repair_responses:
+            metrics.inc("json_repairs_total", outcome="disabled")
+            return result.data, result.failed_sections
+
+        prompt = self._create_repair_prompt(result, response, transcript)
+        # What a full re-run of the extraction call would have cost instead
+        metrics.inc("json_repair_tokens_saved_total", max(
+            0, self._action_prefix().tokens + estimate_tokens(transcript) - estimate_tokens(prompt)
+        ))
         try:
-            return json.loads(text)
-        except json.JSONDecodeError:
-            try:
-                json_match = re.search(r'\{.*\}', text, re.DOTALL)
-                if json_match:
-                    return json.loads(json_match.group())
-                else:
-                    raise ValueError("No JSON structure found in response")
-            except Exception as e:
-                print(f"Failed to extract JSON. Response text: {text}")
-                raise ValueError(f"Could not parse response into JSON: {str(e)}")
+            with metrics.timed("json_extract"):
+                repaired = parse_analysis(self._generate_text(prompt, "repair"))
+        except Exception as e:
+            logger.warning("Repair request failed: %s", e)
+            metrics.inc("json_repairs_total", outcome="error")
+            return result.data, result.failed_sections
+
+        data = dict(result.data)
+        failed = []
+        for section in result.failed_sections:
+            data[section] = merge_section_items(section, result.data[section], repaired.data[section])
+            # A section counts as repaired only when the repair itself came back complete
+            if section in repaired.failed_sections:
+                failed.append(section)
+        metrics.inc("json_repairs_total", outcome="partial" if failed else "repaired")
+        return data, failed
+
+    @staticmethod
+    def _analysis_error(parsed_response: Dict[str, Any], failed: List[str]) -> str:
+        if not any(parsed_response.get(section) for section in ITEM_FIELDS):
+            return "Failed to parse AI response."
+        return f"Incomplete AI response: {', '.join(failed)}"
 
     def process_transcript(self, transcript: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Analyzes a transcript, serving repeated transcripts from the result cache when one is set."""
+        if self.result_cache is None:
+            return self._analyze_transcript(transcript)
+
+        outcome = {}
+
+        def compute() -> Optional[Dict[str, Any]]:
+            result = self._analyze_transcript(transcript)
+            outcome["result"] = result
+            # Only complete analyses are cached; partial ones are retried next time
+            return result["data"] if result["status"] == "success" and not result.get("partial") else None
+
+        data = self.result_cache.get_or_compute(self._cache_key(transcript), compute)
+        if data is None:
+            return outcome.get("result", {
+                "status": "error",
+                "message": "Failed to analyze transcript. Please try again."
+            })
+
+        return {
+            "status": "success",
+            "data": data
+        }
+
+    def stream_transcript(self, transcript: List[Dict[str, Any]]) -> Iterator[Tuple[str, Any]]:
+        """Analyzes a transcript and yields (event, data) pairs as results become available.
+
+        The summary is streamed from the model as summary_delta events while the structured
+        extraction runs in the background; action_steps, key_insights and examples follow,
+        and a final done event carries the full ProcessedContent dict.
+        """
+        cache_key = self._cache_key(transcript)
+        cached = self.result_cache.get(cache_key) if self.result_cache is not None else None
+        if cached is None:
+            windows = self._prepare_windows(transcript)
+            formatted_transcript, compact = windows[0]
+            if len(windows) > 1:
+                # Long transcripts go through map-reduce, which has nothing useful to stream early
+                result = self._analyze_chunked(windows)
+                if result["status"] != "success":
+                    yield "error", {"message": result["message"]}
+                    return
+                cached = result["data"]
+                if result.get("partial"):
+                    # Same contract as the single-call path: partial results carry their errors and are not cached
+                    cached = dict(cached, errors=result["errors"])
+                elif self.result_cache is not None:
+                    self.result_cache.set(cache_key, cached)
+
+        if cached is not None:
+            yield "summary", cached["summary"]
+            for section in ("action_steps", "key_insights", "examples"):
+                yield section, cached[section]
+            yield "done", cached
+            return
+
+        analysis_future = self._submit(
+            self._generate_text, self._create_action_prompt(formatted_transcript), "analysis"
+        )
+
+        errors = {}
+        summary_parts = []
+        summary_prompt = self._create_summary_prompt(formatted_transcript)
+        self._record_payload("llm_summary_stream", "prompt", summary_prompt)
+        # Only time spent waiting on the model counts, not the time the client takes to read each chunk
+        model_seconds = 0.0
+        started = waited = time.perf_counter()
+        try:
+            chunks = iter(self.model.generate_content(summary_prompt, stream=True))
+            model_seconds += time.perf_counter() - waited
+            while True:
+                waited = time.perf_counter()
+                chunk = next(chunks, None)
+                model_seconds += time.perf_counter() - waited
+                if chunk is None:
+                    break
+                if not summary_parts:
+                    metrics.observe("llm_time_to_first_token_seconds", time.perf_counter() - started,
+                                    stage="llm_summary_stream")
+                summary_parts.append(chunk.text)
+                yield "summary_delta", chunk.text
+        except Exception as e:
+            model_seconds += time.perf_counter() - waited
+            metrics.inc("llm_errors_total", stage="llm_summary_stream")
+            errors["summary"] = str(e)
+        finally:
+            metrics.observe("stage_duration_seconds", model_seconds, stage="llm_summary_stream")
+        summary = "".join(summary_parts)
+        self._record_payload("llm_summary_stream", "response", summary)
+        yield "summary", summary
+
+        parsed_response = {}
         try:
-            formatted_transcript = self._format_transcript(transcript)
+            parsed_response, failed = self._parse_analysis(analysis_future.result(), formatted_transcript)
+            if failed:
+                errors["analysis"] = self._analysis_error(parsed_response, failed)
+            if compact is not None:
+                parsed_response = compact.resolve_timestamps(parsed_response)
+        except Exception as e:
+            errors["analysis"] = str(e)
+
+        processed_content = self._build_processed_content(summary, parsed_response).to_dict()
+        for section in ("action_steps", "key_insights", "examples"):
+            yield section, processed_content[section]
 
-            # Get summary
-            summary_response = self.model.generate_content(self._create_summary_prompt(formatted_transcript))
-            summary = summary_response.text
+        if errors:
+            processed_content["errors"] = errors
+        elif self.result_cache is not None:
+            self.result_cache.set(cache_key, processed_content)
+        yield "done", processed_content
 
-            # Get structured analysis
-            action_response = self.model.generate_content(self._create_action_prompt(formatted_transcript))
-            
+    def invalidate_cached_result(self, transcript: List[Dict[str, Any]]) -> None:
+        """Drops the cached analysis for a transcript so the next request re-runs the model."""
+        if self.result_cache is not None:
+            self.result_cache.invalidate(self._cache_key(transcript))
+
+    def _cache_key(self, transcript: List[Dict[str, Any]]) -> str:
+        prompt_version = PROMPT_VERSION
+        if self.prefilter_tokens:
+            # Pre-filtered prompts see less of the transcript, so their results are kept apart
+            prompt_version = f"{prompt_version}|prefilter={self.prefilter_tokens}"
+        if self.local_timestamps:
+            prompt_version = f"{prompt_version}|local_timestamps"
+        return AnalysisCache.key(transcript, self.model_name, prompt_version)
+
+    def _generate_text(self, prompt: str, name: str = "prompt") -> str:
+        """Sends one prompt and records its latency and sizes under the stage llm_<name>,
+        with window indexes such as summary_3 folded into summary."""
+        stage = "llm_" + re.sub(r"_\d+$", "", name)
+        self._record_payload(stage, "prompt", prompt)
+        with metrics.timed(stage):
             try:
-                parsed_response = self._extract_json_from_response(action_response.text)
-            except ValueError as e:
-                print(f"JSON parsing error: {str(e)}")
-                print(f"Raw response: {action_response.text}")
-                return {
-                    "status": "error",
-                    "message": "Failed to parse AI response. Please try again."
-                }
+                text = self.model.generate_content(prompt).text
+            except Exception:
+                metrics.inc("llm_errors_total", stage=stage)
+                raise
+        self._record_payload(stage, "response", text)
+        return text
 
-            action_steps = [
-                ActionItem(
-                    action=item.get('action', ''),
-                    explanation=item.get('explanation', ''),
-                    timestamp=item.get('timestamp', '')
-                )
-                for item in parsed_response.get('action_steps', [])
-            ]
+    @staticmethod
+    def _record_payload(stage: str, direction: str, text: str) -> None:
+        metrics.observe("payload_chars", len(text), SIZE_BUCKETS, stage=stage, direction=direction)
+        metrics.inc("payload_tokens_total", estimate_tokens(text), stage=stage, direction=direction)
 
-            key_insights = [
-                KeyInsight(
-                    keyInsight=item.get('keyInsight', ''),
-                    timestamp=item.get('timestamp', '')
-                )
-                for item in parsed_response.get('key_insights', [])
-            ]
+    def _run_prompts(self, prompts: Dict[str, str]) -> Tuple[Dict[str, str], Dict[str, str]]:
+        """Sends each named prompt to the model, concurrently when enabled.
+        Returns (responses, errors) keyed by name so one failed call does not lose the others."""
+        responses, errors = {}, {}
+        if self.concurrent:
+            futures = {
+                name: self._submit(self._generate_text, prompt, name)
+                for name, prompt in prompts.items()
+            }
+            for name, future in futures.items():
+                try:
+                    responses[name] = future.result()
+                except Exception as e:
+                    errors[name] = str(e)
+        else:
+            for name, prompt in prompts.items():
+                try:
+                    responses[name] = self._generate_text(prompt, name)
+                except Exception as e:
+                    errors[name] = str(e)
+        return responses, errors
 
-            examples = [
-                Example(
-                    example=item.get('example', ''),
-                    timestamp=item.get('timestamp', '')
-                )
-                for item in parsed_response.get('examples', [])
-            ]
+    def _build_processed_content(self, summary: str, parsed_response: Dict[str, Any]) -> ProcessedContent:
+        action_steps = [
+            ActionItem(
+                action=item.get('action', ''),
+                explanation=item.get('explanation', ''),
+                timestamp=item.get('timestamp', '')
+            )
+            for item in parsed_response.get('action_steps', [])
+        ]
 
-            processed_content = ProcessedContent(
-                action_steps=action_steps,
-                key_insights=key_insights,
-                examples=examples,
-                summary=summary
+        key_insights = [
+            KeyInsight(
+                keyInsight=item.get('keyInsight', ''),
+                timestamp=item.get('timestamp', '')
             )
-            
-            print(processed_content.to_dict())
+            for item in parsed_response.get('key_insights', [])
+        ]
 
-            return {
+        examples = [
+            Example(
+                example=item.get('example', ''),
+                timestamp=item.get('timestamp', '')
+            )
+            for item in parsed_response.get('examples', [])
+        ]
+
+        return ProcessedContent(
+            action_steps=action_steps,
+            key_insights=key_insights,
+            examples=examples,
+            summary=summary
+        )
+
+    def _analyze_transcript(self, transcript: List[Dict[str, Any]]) -> Dict[str, Any]:
+        try:
+            windows = self._prepare_windows(transcript)
+            if len(windows) > 1:
+                return self._analyze_chunked(windows)
+            formatted_transcript, compact = windows[0]
+
+            # Get summary and structured analysis
+            responses, errors = self._run_prompts({
+                "summary": self._create_summary_prompt(formatted_transcript),
+                "analysis": self._create_action_prompt(formatted_transcript)
+            })
+
+            parsed_response = {}
+            if "analysis" in responses:
+                parsed_response, failed = self._parse_analysis(responses["analysis"], formatted_transcript)
+                if failed:
+                    logger.warning("Unparseable sections in AI response: %s", failed)
+                    errors["analysis"] = self._analysis_error(parsed_response, failed)
+                if compact is not None:
+                    parsed_response = compact.resolve_timestamps(parsed_response)
+
+            if "summary" in errors and "analysis" in errors:
+                return {
+                    "status": "error",
+                    "message": "Failed to parse AI response. Please try again."
+                }
+
+            processed_content = self._build_processed_content(responses.get("summary", ""), parsed_response)
+            log_sampled(logger, "Processed content", processed_content.to_dict)
+
+            result = {
                 "status": "success",
                 "data": processed_content.to_dict()
             }
+            if errors:
+                # Keep whichever half succeeded and tell the caller what is missing
+                result["partial"] = True
+                result["errors"] = errors
+            return result
 
         except Exception as e:
-            print(f"Error processing transcript: {str(e)}")
+            logger.exception("Error processing transcript: %s", e)
             return {
                 "status": "error",
                 "message": f"Processing error: {str(e)}"
             }
 
+    def _analyze_chunked(
+        self, windows: List[Tuple[str, Optional[Union[CompactTranscript, TranscriptIndex]]]]
+    ) -> Dict[str, Any]:
+        """Map-reduce analysis for long transcripts: every window from _prepare_windows is
+        summarized and extracted in parallel, then the summaries are combined and the
+        extracted items merged."""
+        prompts = {}
+        formatted_windows = [formatted_window for formatted_window, _ in windows]
+        compacts = [compact for _, compact in windows]
+        for idx, formatted_window in enumerate(formatted_windows):
+            prompts[f"summary_{idx}"] = self._create_summary_prompt(formatted_window)
+            prompts[f"analysis_{idx}"] = self._create_action_prompt(formatted_window)
+        responses, errors = self._run_prompts(prompts)
+
+        parsed_responses = []
+        for idx in range(len(windows)):
+            name = f"analysis_{idx}"
+            if name not in responses:
+                continue
+            parsed_response, failed = self._parse_analysis(responses[name], formatted_windows[idx])
+            if failed:
+                logger.warning("Unparseable sections in AI response for window %d: %s", idx, failed)
+                errors[name] = self._analysis_error(parsed_response, failed)
+            if compacts[idx] is not None:
+                parsed_response = compacts[idx].resolve_timestamps(parsed_response)
+            parsed_responses.append(parsed_response)
+
+        summaries = [responses[f"summary_{idx}"] for idx in range(len(windows)) if f"summary_{idx}" in responses]
+        if not summaries and not parsed_responses:
+            return {
+                "status": "error",
+                "message": "Failed to parse AI response. Please try again."
+            }
+
+        summary = summaries[0] if len(summaries) == 1 else ""
+        if len(summaries) > 1:
+            reduced, reduce_errors = self._run_prompts({"summary": self._create_summary_reduce_prompt(summaries)})
+            errors.update(reduce_errors)
+            summary = reduced.get("summary", "\n\n".join(summaries))
+
+        processed_content = self._build_processed_content(summary, merge_analyses(parsed_responses))
+        result = {
+            "status": "success",
+            "data": processed_content.to_dict()
+        }
+        if errors:
+            result["partial"] = True
+            result["errors"] = errors
+        return result
+
 if __name__ == "__main__":
     sample_transcript = [
         {'text': 'First, these six mindsets run counter', 'start': 73.3, 'duration': 3.64},
@@ -38,6 +38,77 @@ const PersonalDevInsightsApp = () => {
     return (match && match[2].length === 11) ? match[2] : null;
   };
 
+  // Poll a background job until it finishes, giving up after maxWaitMs
+  const pollJob = async (jobId, intervalMs = 1000, maxWaitMs = 10 * 60 * 1000) => {
+    const deadline = Date.now() + maxWaitMs;
+    while (Date.now() < deadline) {
+      const response = await axios.get(`http://127.0.0.1:5000/jobs/${jobId}`);
+      if (response.data.status === 'succeeded' || response.data.status === 'failed') {
+        return response.data;
+      }
+      await new Promise(resolve => setTimeout(resolve, intervalMs));
+    }
+    throw new Error('Timed out waiting for the video to be processed.');
+  };
+
+  // Stream transcript, summary and sections over Server-Sent Events as they become available.
+  // Resolves false if the stream could not be opened so the caller can fall back to polling.
+  const streamAnalysis = (extractedVideoId) => new Promise((resolve, reject) => {
+    const source = new EventSource(
+      `http://127.0.0.1:5000/stream-analysis?YouTubeVideoID=${encodeURIComponent(extractedVideoId)}`
+    );
+    let received = false;
+
+    const parse = (event) => {
+      received = true;
+      return JSON.parse(event.data);
+    };
+
+    source.addEventListener('transcript', (event) => {
+      const data = parse(event);
+      setTranscript(data.structured_transcript.map(item => ({
+        text: item.text,
+        start: item.start,
+        duration: item.duration
+      })));
+      setInsights({ actionSteps: [], keyInsights: [], importantExamples: [], summary: '' });
+    });
+    source.addEventListener('summary_delta', (event) => {
+      const delta = parse(event);
+      setInsights(prev => ({ ...prev, summary: prev.summary + delta }));
+    });
+    source.addEventListener('summary', (event) => {
+      const summary = parse(event);
+      setInsights(prev => ({ ...prev, summary }));
+    });
+    source.addEventListener('action_steps', (event) => {
+      const actionSteps = parse(event);
+      setInsights(prev => ({ ...prev, actionSteps }));
+    });
+    source.addEventListener('key_insights', (event) => {
+      const keyInsights = parse(event);
+      setInsights(prev => ({ ...prev, keyInsights }));
+    });
+    source.addEventListener('examples', (event) => {
+      const importantExamples = parse(event);
+      setInsights(prev => ({ ...prev, importantExamples }));
+    });
+    source.addEventListener('done', () => {
+      source.close();
+      resolve(true);
+    });
+    source.addEventListener('error', (event) => {
+      source.close();
+      if (event.data) {
+        reject(new Error(JSON.parse(event.data).message || 'Failed to process transcript.'));
+      } else if (received) {
+        reject(new Error('Connection lost while processing the video.'));
+      } else {
+        resolve(false);
+      }
+    });
+  });
+
   // Handle Video Submission
   const handleVideoSubmission = async (event) => {
     event.preventDefault();
@@ -54,44 +125,35 @@ const PersonalDevInsightsApp = () => {
       }
       setVideoId(extractedVideoId);
   
-      const transcribeResponse = await axios.post(
-        'http://127.0.0.1:5000/transcribe',
+      if (window.EventSource && await streamAnalysis(extractedVideoId)) {
+        return;
+      }
+
+      // Submit an analysis job, then poll for its result instead of holding a connection open
+      const submitResponse = await axios.post(
+        'http://127.0.0.1:5000/jobs',
         { YouTubeVideoID: extractedVideoId }
       );
       
-      if (transcribeResponse.status !== 200) {
-        throw new Error('Failed to fetch transcript.');
+      if (submitResponse.status !== 202) {
+        throw new Error('Failed to submit video for processing.');
       }
       
-      console.log("Response data:", transcribeResponse.data);
+      const job = await pollJob(submitResponse.data.job_id);
       
-      // Assuming the structured_transcript is within the response data
-      const transcriptData = transcribeResponse.data.structured_transcript.map(item => ({
+      if (job.status !== 'succeeded') {
+        throw new Error(job.error || 'Failed to process transcript.');
+      }
+      
+      const transcriptData = job.result.structured_transcript.map(item => ({
         text: item.text,
         start: item.start,
         duration: item.duration
       }));
 
       setTranscript(transcriptData);
-      
-      console.log("Mapped Transcript Data:", transcriptData);
-      
-      const processResponse = await axios.post(
-        'http://127.0.0.1:5000/process-transcript',
-        { transcript: transcriptData },
-        {
-          headers: {
-            'Content-Type': 'application/json'
-          },
-          withCredentials: true
-        }
-      );
-    
-      if (processResponse.status !== 200) {
-        throw new Error('Failed to process transcript.');
-      }
     
-      const analysisData = processResponse.data;
+      const analysisData = job.result.analysis;
     
       if (analysisData.status === 'success') {
         setInsights({